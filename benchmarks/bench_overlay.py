@@ -0,0 +1,126 @@
+"""Micro-benchmark: lectura del overlay de hover con innerHTML repetido frente a una instantánea.
+
+Carga una cuadrícula sintética con el overlay ya visible en Chrome (sin red ni login) y mide,
+por post, los viajes al navegador, los bytes recibidos y el tiempo de cada método:
+
+- antiguo: find_elements + .text por span + dos innerHTML por cada span numérico
+- nuevo: una llamada a read_tile_metrics y el parseo local de extract_count_from_element
+
+Uso: python benchmarks/bench_overlay.py [--posts 24] [--rounds 3]
+"""
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from page_observers import read_tile_metrics
+from postaig import InstagramScraper, HOVER_OVERLAY_SELECTOR
+
+# Icono SVG parecido al del overlay real (el innerHTML lo arrastra entero)
+ICON = '<svg aria-label="Me gusta" viewBox="0 0 48 48" width="19" height="19"><path d="' + "M34.6 3.1c-4.5 0-7.9 1.8-10.6 5.6" * 20 + '"></path></svg>'
+
+TILE = """
+<div class="x1lliihq x1n2onr6 xh8yej3">
+  <a href="/p/POST{index}/">
+    <div class="_aagv"><img alt="" width="300" height="300"></div>
+    <div class="x1ey2m1c x78zum5 xdt5ytf">
+      <style>.x1ey2m1c li::before {{ content: ''; }} .x1ey2m1c li::after {{ content: ''; }}</style>
+      <ul class="x6s0dn4 x78zum5">
+        <li class="x972fbf">{icon}<span class="html-span x1lliihq">{likes}</span></li>
+        <li class="x972fbf">{icon}<span class="html-span x1lliihq">{comments}</span></li>
+      </ul>
+    </div>
+  </a>
+</div>
+"""
+
+def build_page(posts):
+    tiles = "".join(TILE.format(index=i, icon=ICON, likes=1000 + i, comments=10 + i) for i in range(posts))
+    return "data:text/html;charset=utf-8," + quote(f"<html><body>{tiles}</body></html>")
+
+def legacy_extract_count(element, type_str):
+    """Versión anterior de extract_count_from_element (dos innerHTML por span numérico)."""
+    spans = element.find_elements(By.TAG_NAME, "span")
+    for span in spans:
+        text = span.text.strip()
+        if type_str in text.lower() or (re.match(r'^\d+$', text) and ('::before' in element.get_attribute('innerHTML') or '::after' in element.get_attribute('innerHTML'))):
+            numbers = re.findall(r'\d+', text.replace(",", ""))
+            if numbers:
+                return int(numbers[0])
+    for span in element.find_elements(By.CSS_SELECTOR, "span.html-span"):
+        text = span.text.strip()
+        if text and text.isdigit():
+            return int(text)
+    return 0
+
+class TrafficCounter:
+    """Envuelve driver.execute para contar viajes y bytes de las respuestas."""
+
+    def __init__(self, driver):
+        self.calls = 0
+        self.bytes = 0
+        self._execute = driver.execute
+        driver.execute = self.execute
+
+    def execute(self, command, params=None):
+        response = self._execute(command, params)
+        self.calls += 1
+        self.bytes += len(json.dumps(response.get("value"), default=str))
+        return response
+
+    def reset(self):
+        self.calls = 0
+        self.bytes = 0
+
+def measure(counter, links, method):
+    counter.reset()
+    start = time.perf_counter()
+    values = [method(link) for link in links]
+    elapsed = time.perf_counter() - start
+    return values, counter.calls, counter.bytes, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=24)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    options = Options()
+    options.add_argument("--headless=new")
+    driver = webdriver.Chrome(options=options)
+    try:
+        driver.get(build_page(args.posts))
+        links = driver.find_elements(By.CSS_SELECTOR, "a[href*='/p/']")
+        counter = TrafficCounter(driver)
+        scraper = InstagramScraper()
+
+        def legacy(link):
+            overlay = link.find_element(By.CSS_SELECTOR, HOVER_OVERLAY_SELECTOR)
+            return legacy_extract_count(overlay, "like")
+
+        def snapshot(link):
+            metrics = read_tile_metrics(driver, link, HOVER_OVERLAY_SELECTOR)
+            return scraper.extract_count_from_element(metrics['overlays'][0], "like")
+
+        for name, method in (("antiguo (innerHTML)", legacy), ("nuevo (instantánea)", snapshot)):
+            runs = [measure(counter, links, method) for _ in range(args.rounds)]
+            values, calls, received, _ = runs[-1]
+            best = min(run[3] for run in runs)
+            posts = len(links)
+            print(f"{name:22} viajes/post: {calls / posts:5.1f}  "
+                  f"bytes/post: {received / posts:8.0f}  "
+                  f"ms/post: {best * 1000 / posts:6.2f}  "
+                  f"likes correctos: {values == [1000 + i for i in range(posts)]}")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Benchmark de la poda de miniaturas en una cuadrícula infinita de 2.000 posts.
+
+Reproduce el bucle de scroll_to_load_posts (selectores XPath, lectura de href, scroll y espera)
+sobre una página sintética que añade 12 miniaturas con imagen propia cada vez que se llega al
+final, con y sin poda. Cada 10 vueltas muestra la latencia de la vuelta, el heap de JS y el
+número de nodos del DOM según Performance.getMetrics.
+
+Uso: python benchmarks/bench_prune.py [--tiles 2000]
+"""
+import os
+import sys
+import time
+import argparse
+from urllib.parse import quote
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium import webdriver
+from selenium.webdriver.common.by import By
+from selenium.webdriver.chrome.options import Options
+from page_observers import prune_tiles, wait_for_scroll_growth
+from postaig import PRUNED_TILE_FILTER
+
+POST_SELECTOR = "//div[contains(@class, '_aagv')]//a"
+
+# Cuadrícula infinita: cada miniatura lleva una imagen distinta dibujada en un canvas
+PAGE = """
+<html><body style="margin:0">
+<div id="grid" style="display:flex;flex-wrap:wrap;width:960px"></div>
+<div id="sentinel" style="height:1px"></div>
+<script>
+let next = 0;
+const total = %d;
+const grid = document.getElementById('grid');
+const canvas = document.createElement('canvas');
+canvas.width = canvas.height = 300;
+const context = canvas.getContext('2d');
+const addTiles = () => {
+    for (let i = 0; i < 12 && next < total; i++, next++) {
+        context.fillStyle = '#' + ((next * 2654435761) %% 0xffffff).toString(16).padStart(6, '0');
+        context.fillRect(0, 0, 300, 300);
+        context.fillStyle = '#fff';
+        context.fillText('post ' + next, 20, 150);
+        const tile = document.createElement('div');
+        tile.className = 'x1lliihq _aagv';
+        tile.style.cssText = 'width:320px;height:320px';
+        tile.innerHTML = '<a href="/p/POST' + next + '/"><img width="300" height="300" src="' + canvas.toDataURL('image/png') + '"></a>';
+        grid.appendChild(tile);
+    }
+};
+addTiles();
+new IntersectionObserver((entries) => {
+    if (entries.some(entry => entry.isIntersecting)) setTimeout(addTiles, 50);
+}).observe(document.getElementById('sentinel'));
+</script>
+</body></html>
+"""
+
+def metrics(driver):
+    values = driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+    return {metric["name"]: metric["value"] for metric in values}
+
+def run(driver, tiles, prune):
+    driver.get("data:text/html;charset=utf-8," + quote(PAGE % tiles))
+    driver.execute_cdp_cmd("Performance.enable", {})
+    query = POST_SELECTOR + PRUNED_TILE_FILTER if prune else POST_SELECTOR
+    seen = set()
+    iteration = 0
+    rows = []
+    while len(seen) < tiles:
+        start = time.perf_counter()
+        new_elements = []
+        for element in driver.find_elements(By.XPATH, query):
+            link = element.get_attribute("href")
+            if link not in seen:
+                seen.add(link)
+                new_elements.append(element)
+        if prune:
+            prune_tiles(driver, new_elements)
+        latency = time.perf_counter() - start
+
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        result = wait_for_scroll_growth(driver, POST_SELECTOR, 0.05, 2, 0.3)
+        iteration += 1
+        if iteration % 10 == 0 or len(seen) >= tiles:
+            driver.execute_cdp_cmd("HeapProfiler.collectGarbage", {})
+            values = metrics(driver)
+            rows.append((iteration, len(seen), latency * 1000, values["JSHeapUsedSize"] / 1048576, int(values["Nodes"])))
+        if result and result["reason"] == "timeout" and not new_elements:
+            break
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tiles", type=int, default=2000)
+    args = parser.parse_args()
+
+    options = Options()
+    options.add_argument("--headless=new")
+    options.add_argument("--window-size=1000,1000")
+    driver = webdriver.Chrome(options=options)
+    try:
+        for prune in (False, True):
+            print(f"\n=== {'Con poda' if prune else 'Sin poda'} ===")
+            print(f"{'vuelta':>6} {'posts':>6} {'ms/vuelta':>10} {'heap MB':>8} {'nodos':>7}")
+            for iteration, seen, latency, heap, nodes in run(driver, args.tiles, prune):
+                print(f"{iteration:>6} {seen:>6} {latency:>10.1f} {heap:>8.1f} {nodes:>7}")
+    finally:
+        driver.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,585 @@
+"""Motor asíncrono que habla el protocolo DevTools (CDP) directamente con Chrome.
+
+Es una alternativa a chromedriver: un único bucle asyncio controla todas las
+pestañas del navegador, y CDPDriver/CDPElement imitan la parte de la API de
+Selenium que usan los extractores, de modo que process_video o
+scroll_to_load_posts funcionan igual con cualquiera de los dos motores.
+"""
+import os
+import json
+import time
+import shutil
+import asyncio
+import itertools
+import tempfile
+import threading
+import subprocess
+from collections import deque
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import (
+    NoSuchElementException, TimeoutException, JavascriptException, WebDriverException
+)
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+# Tiempos máximos por defecto (segundos)
+COMMAND_TIMEOUT = 30
+PAGE_LOAD_TIMEOUT = 30
+SCRIPT_TIMEOUT = 30
+
+# Máximo de eventos de red guardados para emular el log "performance" de chromedriver
+NETWORK_EVENT_BUFFER = 20000
+
+CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+    os.path.join(os.environ.get("LOCALAPPDATA", ""), "Google", "Chrome", "Application", "chrome.exe"),
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome"
+]
+
+# Búsqueda de elementos dentro de la página, con la misma semántica que By.*
+FIND_ELEMENTS_JS = """function(by, value) {
+    const root = (this && this.nodeType) ? this : document;
+    if (by === 'css selector') return Array.from(root.querySelectorAll(value));
+    if (by === 'tag name') return Array.from(root.getElementsByTagName(value));
+    if (by === 'class name') return Array.from(root.getElementsByClassName(value));
+    if (by === 'name') return Array.from(root.querySelectorAll('[name="' + CSS.escape(value) + '"]'));
+    if (by === 'id') return Array.from(root.querySelectorAll('#' + CSS.escape(value)));
+    if (by === 'link text' || by === 'partial link text') {
+        return Array.from(root.querySelectorAll('a')).filter(a => {
+            const text = (a.innerText || '').trim();
+            return by === 'link text' ? text === value : text.includes(value);
+        });
+    }
+    if (by === 'xpath') {
+        const snapshot = document.evaluate(value, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+        const nodes = [];
+        for (let i = 0; i < snapshot.snapshotLength; i++) nodes.push(snapshot.snapshotItem(i));
+        return nodes;
+    }
+    throw new Error('Estrategia de búsqueda no soportada: ' + by);
+}"""
+
+ELEMENT_TEXT_JS = "function() { return (this.innerText !== undefined ? this.innerText : this.textContent) || ''; }"
+
+ELEMENT_ATTRIBUTE_JS = """function(name) {
+    const value = this[name];
+    if (value !== undefined && value !== null && typeof value !== 'object' && typeof value !== 'function') {
+        return String(value);
+    }
+    return this.getAttribute(name);
+}"""
+
+ELEMENT_DISPLAYED_JS = """function() {
+    const style = getComputedStyle(this);
+    const rect = this.getBoundingClientRect();
+    return style.visibility !== 'hidden' && style.display !== 'none' && (rect.width > 0 || rect.height > 0);
+}"""
+
+ELEMENT_CENTER_JS = """function() {
+    this.scrollIntoView({block: 'center', inline: 'center'});
+    const rect = this.getBoundingClientRect();
+    return {x: rect.left + rect.width / 2, y: rect.top + rect.height / 2};
+}"""
+
+# Envoltorio de cada llamada: un resultado sin nodos vuelve por valor, como texto JSON, en el mismo
+# viaje; solo los nodos y los arrays con nodos vuelven como referencia (se rellena con la función y `this`)
+CALL_JS = """function() {
+    const pack = (value) => {
+        if (value instanceof Node || (Array.isArray(value) && value.some(item => item instanceof Node))) return value;
+        try {
+            return JSON.stringify([value === undefined ? null : value]);
+        } catch (e) {
+            return value;
+        }
+    };
+    const result = (%s).apply(%s, arguments);
+    return (result && typeof result.then === 'function') ? result.then(pack) : pack(result);
+}"""
+
+class CDPError(WebDriverException):
+    """Error devuelto por Chrome al ejecutar un comando CDP."""
+
+def find_chrome_binary():
+    """Localiza el ejecutable de Chrome (se puede forzar con la variable CHROME_PATH)."""
+    if os.environ.get("CHROME_PATH"):
+        return os.environ["CHROME_PATH"]
+    for candidate in CHROME_CANDIDATES:
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    raise WebDriverException("No se encontró Chrome. Define la variable CHROME_PATH.")
+
+class CDPSession:
+    """Conexión websocket asíncrona con un destino de Chrome (navegador o pestaña)."""
+
+    def __init__(self, ws_url):
+        self.ws_url = ws_url
+        self.record_network = False
+        self.network_events = deque(maxlen=NETWORK_EVENT_BUFFER)
+        self._ws = None
+        self._reader = None
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._waiters = {}
+
+    async def connect(self):
+        if websockets is None:
+            raise WebDriverException("El motor CDP necesita el paquete 'websockets' (pip install websockets)")
+        self._ws = await websockets.connect(self.ws_url, max_size=None)
+        self._reader = asyncio.ensure_future(self._read_loop())
+        return self
+
+    async def _read_loop(self):
+        error = WebDriverException("La conexión CDP se cerró")
+        try:
+            async for raw in self._ws:
+                message = json.loads(raw)
+                if "id" in message:
+                    future = self._pending.pop(message["id"], None)
+                    if future and not future.done():
+                        if "error" in message:
+                            future.set_exception(CDPError(message["error"].get("message", str(message["error"]))))
+                        else:
+                            future.set_result(message.get("result", {}))
+                    continue
+
+                method = message.get("method", "")
+                if self.record_network and method.startswith("Network."):
+                    self.network_events.append({"method": method, "params": message.get("params", {}), "timestamp": time.time()})
+                for future in self._waiters.pop(method, []):
+                    if not future.done():
+                        future.set_result(message.get("params", {}))
+        except Exception as e:
+            print(f"Error leyendo la conexión CDP: {e}")
+            error = WebDriverException(f"La conexión CDP se cerró: {e}")
+        finally:
+            # Ningún comando ni evento pendiente debe quedarse esperando a una conexión muerta
+            waiting = list(self._pending.values())
+            for futures in self._waiters.values():
+                waiting.extend(futures)
+            for future in waiting:
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+            self._waiters.clear()
+
+    async def send(self, method, params=None, timeout=COMMAND_TIMEOUT):
+        """Envía un comando y espera su respuesta."""
+        command_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[command_id] = future
+        await self._ws.send(json.dumps({"id": command_id, "method": method, "params": params or {}}))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._pending.pop(command_id, None)
+            raise TimeoutException(f"Sin respuesta de Chrome a {method}")
+
+    def wait_for_event(self, method):
+        """Devuelve un future que se resuelve con los parámetros del próximo evento `method`."""
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.setdefault(method, []).append(future)
+        return future
+
+    async def close(self):
+        if self._ws is not None:
+            await self._ws.close()
+        if self._reader is not None:
+            self._reader.cancel()
+
+class CDPTab:
+    """API asíncrona de una pestaña; varias pestañas comparten el mismo bucle de eventos."""
+
+    def __init__(self, engine, target_id, session):
+        self.engine = engine
+        self.target_id = target_id
+        self.session = session
+
+    async def send(self, method, params=None, timeout=COMMAND_TIMEOUT):
+        return await self.session.send(method, params, timeout)
+
+    async def navigate(self, url, timeout=PAGE_LOAD_TIMEOUT):
+        """Navega a `url` y espera al evento load."""
+        loaded = self.session.wait_for_event("Page.loadEventFired")
+        result = await self.send("Page.navigate", {"url": url})
+        if result.get("errorText"):
+            raise WebDriverException(f"Error al navegar a {url}: {result['errorText']}")
+        if not result.get("loaderId"):
+            # Navegación dentro del mismo documento (p. ej. cambio de hash)
+            return
+        try:
+            await asyncio.wait_for(loaded, timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutException(f"Tiempo de carga agotado para {url}")
+
+    async def reload(self, timeout=PAGE_LOAD_TIMEOUT):
+        loaded = self.session.wait_for_event("Page.loadEventFired")
+        await self.send("Page.reload", {})
+        await asyncio.wait_for(loaded, timeout)
+
+    async def evaluate(self, expression, await_promise=False, timeout=COMMAND_TIMEOUT):
+        """Evalúa una expresión y devuelve su valor serializado."""
+        result = await self.send("Runtime.evaluate", {
+            "expression": expression,
+            "returnByValue": True,
+            "awaitPromise": await_promise
+        }, timeout)
+        self._raise_for_exception(result)
+        return result["result"].get("value")
+
+    async def call(self, declaration, args=(), object_id=None, await_promise=False, timeout=COMMAND_TIMEOUT):
+        """Llama a una función JS (con `this` = object_id, o el objeto global) y convierte el resultado a Python."""
+        elements = [arg for arg in args if isinstance(arg, CDPElement)]
+        if object_id is None and not elements:
+            # Llamada de página sin nodos como argumento: un solo Runtime.evaluate, sin pedir el objeto global
+            expression = "(%s).apply(globalThis, %s)" % (CALL_JS % (declaration, "globalThis"), json.dumps(list(args)))
+            result = await self.send("Runtime.evaluate", {
+                "expression": expression,
+                "awaitPromise": await_promise
+            }, timeout)
+        else:
+            # Sin object_id la función se lanza sobre el primer nodo recibido, pero `this` sigue siendo el global
+            call_args = []
+            for arg in args:
+                if isinstance(arg, CDPElement):
+                    call_args.append({"objectId": arg.object_id})
+                else:
+                    call_args.append({"value": arg})
+            result = await self.send("Runtime.callFunctionOn", {
+                "functionDeclaration": CALL_JS % (declaration, "this" if object_id else "globalThis"),
+                "objectId": object_id or elements[0].object_id,
+                "arguments": call_args,
+                "returnByValue": False,
+                "awaitPromise": await_promise
+            }, timeout)
+        self._raise_for_exception(result)
+        remote = result["result"]
+        if remote.get("type") == "string":
+            # CALL_JS empaqueta como JSON todo resultado sin nodos
+            return json.loads(remote["value"])[0]
+        return await self._to_python(remote)
+
+    async def _to_python(self, remote):
+        """Convierte un RemoteObject en valores Python (los nodos se devuelven como CDPElement)."""
+        if remote.get("type") == "undefined" or remote.get("subtype") == "null":
+            return None
+        if "objectId" not in remote:
+            return remote.get("value")
+        if remote.get("subtype") == "node":
+            return CDPElement(self, remote["objectId"])
+        if remote.get("subtype") == "array":
+            # Solo llegan aquí arrays con nodos: los nodos se convierten sin más viajes
+            properties = await self.send("Runtime.getProperties", {"objectId": remote["objectId"], "ownProperties": True})
+            items = [p for p in properties["result"] if p["name"].isdigit()]
+            items.sort(key=lambda p: int(p["name"]))
+            return [await self._to_python(p["value"]) for p in items]
+        result = await self.send("Runtime.callFunctionOn", {
+            "functionDeclaration": "function() { return this; }",
+            "objectId": remote["objectId"],
+            "returnByValue": True
+        })
+        return result["result"].get("value")
+
+    def _raise_for_exception(self, result):
+        details = result.get("exceptionDetails")
+        if details:
+            exception = details.get("exception", {})
+            raise JavascriptException(exception.get("description") or details.get("text", "Error de JavaScript"))
+
+    async def find_elements(self, by, value, root=None):
+        elements = await self.call(FIND_ELEMENTS_JS, (by, value), object_id=root.object_id if root else None)
+        return elements or []
+
+    async def mouse_event(self, event_type, x, y, button="none", click_count=0):
+        await self.send("Input.dispatchMouseEvent", {
+            "type": event_type, "x": x, "y": y, "button": button, "clickCount": click_count
+        })
+
+    async def close(self):
+        await self.session.close()
+
+class CDPEngine:
+    """Lanza un Chrome con depuración remota y un bucle asyncio (en un hilo) para todas sus pestañas."""
+
+    def __init__(self, arguments=None, chrome_path=None, headless=False):
+        self.arguments = list(arguments or [])
+        self.chrome_path = chrome_path
+        self.headless = headless
+        self.process = None
+        self.loop = None
+        self.browser = None
+        self.port = None
+        self._thread = None
+        self._temp_dir = None
+
+    def _user_data_dir(self):
+        for argument in self.arguments:
+            if argument.startswith("--user-data-dir="):
+                return argument.split("=", 1)[1]
+        self._temp_dir = tempfile.mkdtemp(prefix="cdp_profile_")
+        self.arguments.append(f"--user-data-dir={self._temp_dir}")
+        return self._temp_dir
+
+    def start(self, timeout=20):
+        """Arranca Chrome y se conecta al websocket del navegador."""
+        user_data_dir = self._user_data_dir()
+        os.makedirs(user_data_dir, exist_ok=True)
+        port_file = os.path.join(user_data_dir, "DevToolsActivePort")
+        if os.path.exists(port_file):
+            os.remove(port_file)
+
+        command = [self.chrome_path or find_chrome_binary(), "--remote-debugging-port=0",
+                   "--no-first-run", "--no-default-browser-check"]
+        command += [a for a in self.arguments if not a.startswith("--remote-debugging-port")]
+        if self.headless:
+            command.append("--headless=new")
+        command.append("about:blank")
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+        # Chrome escribe el puerto y la ruta del websocket del navegador en DevToolsActivePort
+        deadline = time.time() + timeout
+        lines = []
+        while time.time() < deadline:
+            try:
+                with open(port_file, "r", encoding="utf-8") as f:
+                    lines = f.read().split()
+                if len(lines) >= 2:
+                    break
+            except OSError:
+                pass
+            time.sleep(0.1)
+        if len(lines) < 2:
+            self.quit()
+            raise WebDriverException("Chrome no abrió el puerto de depuración remota")
+        self.port = int(lines[0])
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self._thread.start()
+        self.browser = self.run(CDPSession(f"ws://127.0.0.1:{self.port}{lines[1]}").connect())
+        return self
+
+    def run(self, coroutine, timeout=None):
+        """Ejecuta una corrutina en el bucle del motor desde código síncrono."""
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result(timeout)
+
+    async def new_tab(self, url="about:blank"):
+        """Abre una pestaña nueva y devuelve su CDPTab."""
+        target = await self.browser.send("Target.createTarget", {"url": url})
+        session = await CDPSession(f"ws://127.0.0.1:{self.port}/devtools/page/{target['targetId']}").connect()
+        tab = CDPTab(self, target["targetId"], session)
+        await tab.send("Page.enable")
+        await tab.send("Runtime.enable")
+        return tab
+
+    async def close_tab(self, tab):
+        try:
+            await self.browser.send("Target.closeTarget", {"targetId": tab.target_id})
+        finally:
+            await tab.close()
+
+    def new_driver(self):
+        """Devuelve un CDPDriver sobre una pestaña nueva de este mismo navegador."""
+        return CDPDriver(self, self.run(self.new_tab()))
+
+    def quit(self):
+        """Cierra el navegador y detiene el bucle de eventos."""
+        if self.browser is not None:
+            try:
+                self.run(self.browser.send("Browser.close"), timeout=5)
+            except Exception:
+                pass
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=5)
+            except Exception:
+                self.process.kill()
+        if self.loop is not None:
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._temp_dir:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+
+class CDPElement:
+    """Elemento del DOM con la interfaz de WebElement que usan los extractores."""
+
+    def __init__(self, tab, object_id):
+        self.tab = tab
+        self.object_id = object_id
+
+    def _run(self, coroutine):
+        return self.tab.engine.run(coroutine)
+
+    def _call(self, declaration, *args):
+        return self._run(self.tab.call(declaration, args, object_id=self.object_id))
+
+    @property
+    def text(self):
+        return self._call(ELEMENT_TEXT_JS).strip()
+
+    @property
+    def tag_name(self):
+        return self._call("function() { return this.tagName.toLowerCase(); }")
+
+    def get_attribute(self, name):
+        return self._call(ELEMENT_ATTRIBUTE_JS, name)
+
+    def is_displayed(self):
+        return bool(self._call(ELEMENT_DISPLAYED_JS))
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._run(self.tab.find_elements(by, value, root=self))
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No se encontró el elemento: {by}={value}")
+        return elements[0]
+
+    def _center(self):
+        point = self._call(ELEMENT_CENTER_JS)
+        return point["x"], point["y"]
+
+    def hover(self):
+        """Mueve el ratón real (eventos de confianza) al centro del elemento."""
+        x, y = self._center()
+        self._run(self.tab.mouse_event("mouseMoved", x, y))
+
+    def click(self):
+        x, y = self._center()
+        self._run(self.tab.mouse_event("mouseMoved", x, y))
+        self._run(self.tab.mouse_event("mousePressed", x, y, "left", 1))
+        self._run(self.tab.mouse_event("mouseReleased", x, y, "left", 1))
+
+    def clear(self):
+        self._call("function() { this.value = ''; this.dispatchEvent(new Event('input', {bubbles: true})); }")
+
+    def send_keys(self, text):
+        self._call("function() { this.focus(); }")
+        self._run(self.tab.send("Input.insertText", {"text": str(text)}))
+
+class CDPDriver:
+    """Adaptador síncrono con la interfaz de webdriver.Chrome sobre una pestaña CDP."""
+
+    def __init__(self, engine, tab, owns_engine=False):
+        self.engine = engine
+        self.tab = tab
+        self.owns_engine = owns_engine
+        self.page_load_timeout = PAGE_LOAD_TIMEOUT
+        self.script_timeout = SCRIPT_TIMEOUT
+
+    def _run(self, coroutine, timeout=None):
+        return self.engine.run(coroutine, timeout)
+
+    def get(self, url):
+        self._run(self.tab.navigate(url, self.page_load_timeout))
+
+    def refresh(self):
+        self._run(self.tab.reload(self.page_load_timeout))
+
+    def back(self):
+        self.execute_script("history.back();")
+        time.sleep(1)
+
+    @property
+    def current_url(self):
+        return self._run(self.tab.evaluate("location.href"))
+
+    @property
+    def title(self):
+        return self._run(self.tab.evaluate("document.title"))
+
+    @property
+    def page_source(self):
+        return self._run(self.tab.evaluate("document.documentElement.outerHTML"))
+
+    def set_script_timeout(self, seconds):
+        self.script_timeout = seconds
+
+    def set_page_load_timeout(self, seconds):
+        self.page_load_timeout = seconds
+
+    def execute_script(self, script, *args):
+        return self._run(self.tab.call(f"function() {{\n{script}\n}}", args))
+
+    def execute_async_script(self, script, *args):
+        # El último argumento es el callback, igual que en Selenium
+        declaration = f"""function() {{
+            const args = Array.from(arguments);
+            return new Promise((resolve) => {{
+                args.push(resolve);
+                (function() {{
+{script}
+                }}).apply(this, args);
+            }});
+        }}"""
+        return self._run(self.tab.call(declaration, args, await_promise=True, timeout=self.script_timeout))
+
+    def find_elements(self, by=By.ID, value=None):
+        return self._run(self.tab.find_elements(by, value))
+
+    def find_element(self, by=By.ID, value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise NoSuchElementException(f"No se encontró el elemento: {by}={value}")
+        return elements[0]
+
+    def execute_cdp_cmd(self, cmd, cmd_args=None):
+        if cmd == "Network.enable":
+            self.tab.session.record_network = True
+        return self._run(self.tab.send(cmd, cmd_args or {}))
+
+    def get_log(self, log_type):
+        """Emula el log "performance" de chromedriver con los eventos Network recibidos."""
+        if log_type != "performance":
+            return []
+        events = self.tab.session.network_events
+        entries = []
+        while events:
+            event = events.popleft()
+            entries.append({
+                "level": "INFO",
+                "timestamp": int(event["timestamp"] * 1000),
+                "message": json.dumps({"message": {"method": event["method"], "params": event["params"]}})
+            })
+        return entries
+
+    def get_cookies(self):
+        return self._run(self.tab.send("Network.getCookies"))["cookies"]
+
+    def get_cookie(self, name):
+        for cookie in self.get_cookies():
+            if cookie["name"] == name:
+                return cookie
+        return None
+
+    def add_cookie(self, cookie):
+        params = {k: v for k, v in cookie.items() if k in ("name", "value", "domain", "path", "secure", "httpOnly", "sameSite")}
+        expires = cookie.get("expiry", cookie.get("expires"))
+        if expires and expires > 0:
+            params["expires"] = expires
+        if "domain" not in params:
+            params["url"] = self.current_url
+        self._run(self.tab.send("Network.setCookie", params))
+
+    def delete_all_cookies(self):
+        self._run(self.tab.send("Network.clearBrowserCookies"))
+
+    def quit(self):
+        """Cierra la pestaña (y el navegador si este driver lo lanzó)."""
+        try:
+            self._run(self.engine.close_tab(self.tab), timeout=10)
+        except Exception:
+            pass
+        if self.owns_engine:
+            self.engine.quit()
+
+def create_cdp_driver(arguments=None, chrome_path=None, headless=False):
+    """Lanza un Chrome propio y devuelve un CDPDriver sobre su primera pestaña."""
+    engine = CDPEngine(arguments, chrome_path, headless).start()
+    driver = CDPDriver(engine, engine.run(engine.new_tab()), owns_engine=True)
+    return driver
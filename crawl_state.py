@@ -0,0 +1,75 @@
+"""Estado del rastreo incremental de un perfil.
+
+Guarda en disco las URLs (o shortcodes) de los posts vistos en ejecuciones
+anteriores, de la más reciente a la más antigua. En la siguiente ejecución el
+scroll se detiene en cuanto aparecen varios posts conocidos seguidos, y solo se
+procesan los nuevos más, opcionalmente, los N conocidos más recientes para
+refrescar sus métricas.
+"""
+import os
+import json
+
+CRAWL_STATE_DIR = os.path.join(os.getcwd(), "estado_rastreo")
+
+# Posts conocidos consecutivos que detienen el scroll (por encima de los fijados, que salen primero)
+DELTA_STOP_AFTER = 6
+
+class CrawlState:
+    """Posts vistos de un perfil y contador de conocidos consecutivos de la ejecución actual."""
+
+    def __init__(self, site, profile, stop_after=DELTA_STOP_AFTER, refresh_recent=0, directory=CRAWL_STATE_DIR):
+        self.path = os.path.join(directory, f"{site}_{profile}.json")
+        self.stop_after = stop_after
+        self.known = self._load()
+        self._known_set = set(self.known)
+        self.refresh = set(self.known[:refresh_recent])
+        self.new_keys = []
+        self.processed = set()
+        self.consecutive_known = 0
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('seen', [])
+        except (OSError, ValueError):
+            return []
+
+    @staticmethod
+    def normalize(key):
+        return key.split('?')[0].rstrip('/')
+
+    def check(self, key):
+        """Registra un post descubierto y devuelve True si hay que procesarlo (nuevo o a refrescar).
+        Los posts a refrescar no cuentan como conocidos seguidos, así la parada no los deja fuera."""
+        key = self.normalize(key)
+        if key in self.refresh:
+            return True
+        if key in self._known_set:
+            self.consecutive_known += 1
+            return False
+        self.consecutive_known = 0
+        self._known_set.add(key)
+        self.new_keys.append(key)
+        return True
+
+    def should_stop(self):
+        """True cuando ya han salido `stop_after` posts conocidos seguidos."""
+        return bool(self.known) and self.consecutive_known >= self.stop_after
+
+    def mark_seen(self, key):
+        """Marca un post como visto tras extraer sus datos; los que fallan se reintentan en la siguiente ejecución."""
+        self.processed.add(self.normalize(key))
+
+    def save(self):
+        """Escribe el estado con los posts nuevos ya extraídos delante de los ya conocidos."""
+        new_keys = [key for key in self.new_keys if key in self.processed]
+        seen = new_keys + self.known
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'seen': seen}, f, indent=2)
+            os.replace(temp_path, self.path)
+            print(f"Estado del rastreo guardado: {len(new_keys)} posts nuevos, {len(seen)} en total")
+        except OSError as e:
+            print(f"No se pudo guardar el estado del rastreo: {e}")
@@ -1,17 +1,120 @@
 import os
 import csv
+import json
 import time
 import random
+import shutil
+import argparse
+import queue
+import threading
 import concurrent.futures
+from datetime import datetime, timezone
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, StaleElementReferenceException
+from selenium.common.exceptions import TimeoutException
+from cdp_engine import create_cdp_driver
+from selector_registry import SelectorRegistry
+from crawl_state import CrawlState, DELTA_STOP_AFTER
+from page_observers import watch_for_captcha, reset_captcha_watch, dismiss_popups, wait_for_scroll_growth, track_network
 
-def set_chrome_options():
+# Estadísticas de aciertos de las listas de selectores alternativos (persisten entre ejecuciones)
+SELECTORS = SelectorRegistry("tiktok")
+
+# Perfil plantilla (sembrado con cookies/sesión) y carpeta de los perfiles por worker
+PROFILE_TEMPLATE_DIR = os.path.join(os.getcwd(), "chrome_profile")
+WORKER_PROFILES_DIR = os.path.join(os.getcwd(), "chrome_profiles")
+
+# Bloqueos y cachés de Chrome que no se copian al clonar la plantilla
+PROFILE_COPY_IGNORE = shutil.ignore_patterns(
+    "Singleton*", "lockfile", "*.lock", "LOCK",
+    "Cache", "Code Cache", "GPUCache", "ShaderCache", "GrShaderCache", "Crashpad"
+)
+
+# Intervalo mínimo global entre páginas de video de TikTok, compartido por todos los workers
+DOMAIN_MIN_INTERVAL = 3.0
+
+# Pausas entre videos de un mismo navegador para evitar detección (segundos)
+MIN_VIDEO_DELAY = 5
+MAX_VIDEO_DELAY = 12
+
+# Espera tras cada scroll del perfil: mínimo de ritmo, máximo y silencio de red que la da por terminada (segundos)
+SCROLL_WAIT_FLOOR = 1.0
+SCROLL_WAIT_CEILING = 5.0
+SCROLL_NETWORK_IDLE = 0.8
+
+# Modo pipeline: URLs en cola por cada worker de detalle (el rastreador se bloquea si la cola se llena)
+PIPELINE_QUEUE_PER_WORKER = 2
+
+# Pausas largas ocasionales durante el scroll para parecer más humano
+RANDOM_PAUSE_CHANCE = 0.3
+RANDOM_PAUSE_RANGE = (3, 8)
+
+# Indicadores de CAPTCHA/verificación que vigila el observador inyectado en cada página:
+# pares (etiqueta, texto contenido) y fragmentos del src de iframes
+CAPTCHA_PATTERNS = {
+    'text': [
+        ('div', 'CAPTCHA'),
+        ('div', 'captcha'),
+        ('div', 'Verify'),
+        ('div', 'verificar'),
+        ('h2', 'Verificación de seguridad'),
+        ('p', 'Something went wrong'),
+        ('p', 'verification'),
+        ('h1', 'Security Verification')
+    ],
+    'iframe_src': ['captcha']
+}
+
+# Umbrales a partir de los cuales se recicla el navegador
+RECYCLE_MAX_PAGES = 150
+RECYCLE_MAX_HEAP_MB = 1024
+
+# Patrones de URL bloqueados en modo ligero (imágenes, media, fuentes y trackers)
+LEAN_BLOCKED_URLS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.avif*", "*.heic*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m4a*", "*.mp3*", "*/video/tos/*",
+    "*.woff*", "*.ttf*", "*.otf*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*analytics.tiktok.com*", "*mon.tiktokv.com*"
+]
+
+# Patrones de LEAN_BLOCKED_URLS que no deben bloquearse aunque el modo ligero esté activo
+LEAN_ALLOWLIST = []
+
+def create_worker_profile(worker_id):
+    """Clona el perfil plantilla en un directorio exclusivo para el worker."""
+    profile_dir = os.path.join(WORKER_PROFILES_DIR, f"worker_{worker_id}_{os.getpid()}")
+    if os.path.exists(profile_dir):
+        shutil.rmtree(profile_dir, ignore_errors=True)
+    
+    if os.path.exists(PROFILE_TEMPLATE_DIR):
+        shutil.copytree(PROFILE_TEMPLATE_DIR, profile_dir, ignore=PROFILE_COPY_IGNORE)
+    else:
+        os.makedirs(os.path.join(profile_dir, "Default"))
+    return profile_dir
+
+def remove_worker_profile(profile_dir):
+    """Elimina el perfil clonado de un worker."""
+    shutil.rmtree(profile_dir, ignore_errors=True)
+
+def clone_worker_profiles(worker_ids):
+    """Clona la plantilla para todos los workers de una vez, antes de abrir el navegador principal:
+    copiar la plantilla en uso arrastra SQLite a medio escribir (y en Windows, ficheros bloqueados)."""
+    profiles = {}
+    try:
+        for worker_id in worker_ids:
+            profiles[worker_id] = create_worker_profile(worker_id)
+    except Exception:
+        for profile_dir in profiles.values():
+            remove_worker_profile(profile_dir)
+        raise
+    return profiles
+
+def set_chrome_options(lean=False, profile_dir=None):
     """Configura las opciones de Chrome para la automatización."""
     chrome_options = Options()
     #chrome_options.add_argument("--headless")  # Comentar para ver el navegador
@@ -30,7 +133,7 @@ def set_chrome_options():
     chrome_options.add_argument("--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/112.0.0.0 Safari/537.36")
     
     # Configuración para evitar el selector de perfiles en Windows
-    profile_dir = os.path.join(os.getcwd(), "chrome_profile")
+    profile_dir = profile_dir or PROFILE_TEMPLATE_DIR
     if not os.path.exists(profile_dir):
         os.makedirs(profile_dir)
     
@@ -55,8 +158,52 @@ def set_chrome_options():
     }
     chrome_options.add_experimental_option("prefs", prefs)
     
+    # En modo ligero se registra la red para poder medir los bytes transferidos
+    if lean:
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    
     return chrome_options
 
+def create_driver(lean=False, profile_dir=None, backend="selenium"):
+    """Crea el navegador con el motor indicado: 'selenium' (chromedriver) o 'cdp' (DevTools directo)."""
+    chrome_options = set_chrome_options(lean, profile_dir)
+    if backend == "cdp":
+        driver = create_cdp_driver(chrome_options.arguments)
+    else:
+        driver = webdriver.Chrome(options=chrome_options)
+    if lean:
+        enable_lean_mode(driver)
+    return driver
+
+def enable_lean_mode(driver, allowlist=None):
+    """Bloquea imágenes, media, fuentes y trackers mediante CDP."""
+    allowlist = LEAN_ALLOWLIST if allowlist is None else allowlist
+    blocked = [pattern for pattern in LEAN_BLOCKED_URLS if pattern not in allowlist]
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+        print(f"⚡ Modo ligero activado ({len(blocked)} patrones bloqueados)")
+    except Exception as e:
+        print(f"⚠️ No se pudo activar el modo ligero: {str(e)}")
+    return blocked
+
+def get_transferred_bytes(driver):
+    """Suma los bytes recibidos desde la última lectura del log de red (None si no está disponible)."""
+    try:
+        entries = driver.get_log("performance")
+    except Exception:
+        return None
+    
+    total = 0
+    for entry in entries:
+        try:
+            message = json.loads(entry["message"])["message"]
+            if message["method"] == "Network.loadingFinished":
+                total += message["params"].get("encodedDataLength", 0)
+        except (KeyError, ValueError):
+            continue
+    return total
+
 def convert_count_to_number(count_str):
     """Convierte strings de conteo como '13.3K' o '1.2M' a números enteros"""
     try:
@@ -85,32 +232,25 @@ def wait_for_element(driver, css_selector, timeout=10):
     except TimeoutException:
         return None
 
-def check_for_captcha(driver):
+def check_for_captcha(driver, patterns=None):
     """Verifica si hay un CAPTCHA presente y espera a que se resuelva."""
-    # Detectar posibles indicadores de CAPTCHA
-    captcha_indicators = [
-        "//div[contains(text(), 'CAPTCHA')]",
-        "//div[contains(text(), 'captcha')]",
-        "//div[contains(text(), 'Verify')]",
-        "//div[contains(text(), 'verificar')]",
-        "//iframe[contains(@src, 'captcha')]",
-        "//h2[contains(text(), 'Verificación de seguridad')]",
-        "//p[contains(text(), 'Something went wrong')]",
-        "//p[contains(text(), 'verification')]",
-        "//h1[contains(text(), 'Security Verification')]"
-    ]
+    # Un observador inyectado en la página marca los indicadores; aquí solo se lee la marca
+    try:
+        indicator = watch_for_captcha(driver, patterns or CAPTCHA_PATTERNS)
+    except Exception:
+        return False
     
-    for indicator in captcha_indicators:
+    if indicator:
+        print(f"⚠️ CAPTCHA detectado ({indicator})! Por favor, resuélvelo manualmente.")
+        print("⚠️ La interfaz puede cambiar dependiendo de la verificación.")
+        print("⚠️ Completa la verificación de seguridad y luego continúa.")
+        input("✅ Presiona Enter cuando hayas resuelto el CAPTCHA...")
+        time.sleep(2)  # Dar tiempo para que la página se actualice después del CAPTCHA
         try:
-            if driver.find_elements(By.XPATH, indicator):
-                print("⚠️ CAPTCHA detectado! Por favor, resuélvelo manualmente.")
-                print("⚠️ La interfaz puede cambiar dependiendo de la verificación.")
-                print("⚠️ Completa la verificación de seguridad y luego continúa.")
-                input("✅ Presiona Enter cuando hayas resuelto el CAPTCHA...")
-                time.sleep(2)  # Dar tiempo para que la página se actualice después del CAPTCHA
-                return True
-        except:
+            reset_captcha_watch(driver)
+        except Exception:
             pass
+        return True
     
     return False
 
@@ -150,33 +290,33 @@ def human_like_scroll(driver, scroll_amount=None):
     # Esperar a que termine la animación
     time.sleep(random.uniform(0.5, 1.5))
 
+# Botones de cierre que el observador inyectado pulsa en cuanto aparecen
+POPUP_SELECTORS = [
+    "button[data-e2e='cookie-banner-close']",
+    "button[data-e2e='modal-close-inner-button']",
+    "button.tiktok-btn-pc-primary",
+    "button.decline-button",
+    "button.button-primary",
+    "button.close-button",
+    "button[aria-label='Close']",
+    "div.modal-close",
+    "[data-testid='close-button']"
+]
+
 def close_popups(driver):
     """Cierra cualquier popup que pueda aparecer."""
-    popup_selectors = [
-        "button[data-e2e='cookie-banner-close']",
-        "button[data-e2e='modal-close-inner-button']",
-        "button.tiktok-btn-pc-primary",
-        "button.decline-button",
-        "button.button-primary",
-        "button.close-button",
-        "button[aria-label='Close']",
-        "div.modal-close",
-        "[data-testid='close-button']"
-    ]
+    # Una sola llamada: instala el observador (si falta) que cierra también los popups futuros
+    try:
+        result = dismiss_popups(driver, POPUP_SELECTORS)
+    except Exception:
+        return {}
     
-    for selector in popup_selectors:
-        try:
-            buttons = driver.find_elements(By.CSS_SELECTOR, selector)
-            for button in buttons:
-                if button.is_displayed():
-                    button.click()
-                    print(f"Popup cerrado con selector: {selector}")
-                    time.sleep(1)
-        except Exception as e:
-            pass
+    for selector in result['closed']:
+        print(f"Popup cerrado con selector: {selector}")
+    return result['counts']
 
-def scroll_page(driver, max_scrolls=10):
-    """Desplaza la página hacia abajo para cargar más videos."""
+def find_video_selector(driver):
+    """Devuelve el selector de miniaturas que funciona en el perfil, empezando por el que más acierta."""
     # Intentar diferentes selectores para videos/posts
     post_selectors = [
         "div[data-e2e='user-post-item']",
@@ -186,10 +326,11 @@ def scroll_page(driver, max_scrolls=10):
         "div[data-e2e='user-post-item-container']"
     ]
     
-    # Encontrar el selector que funciona
+    # Encontrar el selector que funciona, empezando por el que más acierta
     video_selector = None
-    for selector in post_selectors:
+    for selector in SELECTORS.ordered('tiktok.profile.post', post_selectors):
         elements = driver.find_elements(By.CSS_SELECTOR, selector)
+        SELECTORS.record('tiktok.profile.post', selector, bool(elements))
         if elements:
             video_selector = selector
             print(f"Usando selector: {selector} - Encontrados: {len(elements)} elementos")
@@ -199,12 +340,29 @@ def scroll_page(driver, max_scrolls=10):
         print("⚠️ No se puede identificar el selector de videos. Probando con el valor por defecto.")
         video_selector = "div[data-e2e='user-post-item']"
     
-    video_count = len(driver.find_elements(By.CSS_SELECTOR, video_selector))
+    return video_selector
+
+def scroll_page(driver, max_scrolls=10, max_videos=None):
+    """Desplaza la página hacia abajo para cargar más videos, recolectando las miniaturas tras cada paso.
+    Devuelve (número de videos, selector, miniaturas únicas en orden de aparición)."""
+    video_selector = find_video_selector(driver)
+    tiles = list(iter_tiles(driver, video_selector, max_scrolls, max_videos))
+    return len(tiles), video_selector, tiles
+
+def iter_tiles(driver, video_selector, max_scrolls=10, max_videos=None):
+    """Genera las miniaturas nuevas tras cada paso de scroll, sin esperar a que termine."""
+    # Miniaturas recolectadas y sus claves: las grillas virtualizadas desmontan las primeras al avanzar
+    tiles = []
+    seen_keys = set()
+    track_network(driver)
+    harvest_step(driver, video_selector, tiles, seen_keys)
+    yield from tiles[:max_videos] if max_videos else tiles
+    video_count = len(tiles)
     
     scroll_count = 0
     no_new_videos_count = 0
     
-    while scroll_count < max_scrolls:
+    while scroll_count < max_scrolls and not (max_videos and video_count >= max_videos):
         # Verificar si hay un CAPTCHA antes de hacer scroll
         if check_for_captcha(driver):
             print("CAPTCHA resuelto, continuando...")
@@ -215,11 +373,17 @@ def scroll_page(driver, max_scrolls=10):
         # Hacer scroll de manera más humana
         human_like_scroll(driver)
         
-        # Esperar un tiempo aleatorio entre scrolls (más realista)
-        time.sleep(random.uniform(2, 5))
+        # Esperar a que carguen videos nuevos (o a que la red quede inactiva), con un mínimo aleatorio de ritmo
+        floor = random.uniform(SCROLL_WAIT_FLOOR, SCROLL_WAIT_FLOOR * 2)
+        result = wait_for_scroll_growth(driver, video_selector, floor, SCROLL_WAIT_CEILING, SCROLL_NETWORK_IDLE)
+        
+        if result:
+            print(f"Espera de scroll: {result['elapsed']:.1f} s ({result['reason']})")
         
-        # Verificar si se cargaron nuevos videos
-        new_videos = len(driver.find_elements(By.CSS_SELECTOR, video_selector))
+        # Recolectar las miniaturas montadas ahora, entregar las nuevas y contarlas
+        harvest_step(driver, video_selector, tiles, seen_keys)
+        new_videos = len(tiles)
+        yield from tiles[video_count:max_videos] if max_videos else tiles[video_count:]
         
         print(f"Videos cargados: {new_videos}")
         
@@ -237,180 +401,394 @@ def scroll_page(driver, max_scrolls=10):
         scroll_count += 1
         
         # Pausa aleatoria ocasionalmente para parecer más humano
-        if random.random() < 0.3:  # 30% de probabilidad
-            pause_time = random.uniform(3, 8)
+        if random.random() < RANDOM_PAUSE_CHANCE:
+            pause_time = random.uniform(*RANDOM_PAUSE_RANGE)
             print(f"Haciendo una pausa de {pause_time:.1f} segundos...")
             time.sleep(pause_time)
+
+def harvest_step(driver, video_selector, tiles, seen_keys):
+    """Añade a `tiles` las miniaturas montadas que aún no se habían visto.
+    Las que no tienen enlace se resuelven en este momento, mientras siguen en el DOM."""
+    for tile in harvest_tiles(driver, video_selector):
+        if tile['key'] in seen_keys:
+            continue
+        seen_keys.add(tile['key'])
+        
+        # Método 5: capturar la URL que publica el SPA con pushState, sin recargar
+        if not tile['href']:
+            tile['href'], navigated = resolve_tile_url_via_history(driver, video_selector, tile['index'])
+            # Una URL ya vista: la miniatura volvió a montarse sin enlace y se había entregado antes
+            duplicate = tile['href'] in seen_keys
+            if tile['href'] and not duplicate:
+                seen_keys.add(tile['href'])
+            if not duplicate:
+                tiles.append(tile)
+            if navigated:
+                # El clic salió del perfil: volver y seguir en el siguiente paso (los índices ya no valen)
+                driver.back()
+                return
+            continue
+        tiles.append(tile)
+
+# Selectores del contador de vistas dentro de cada miniatura del perfil
+TILE_VIEWS_SELECTORS = [
+    "strong[data-e2e='video-views']",
+    "span[data-e2e='video-views']",
+    "strong.video-count",
+    "span.video-count"
+]
+
+# Recorre todas las miniaturas en la página y devuelve href, vistas e índice de cada una
+HARVEST_TILES_JS = """
+const tiles = document.querySelectorAll(arguments[0]);
+const viewsSelectors = arguments[1];
+const limit = arguments[2] || tiles.length;
+const results = [];
+const ID_PATTERN = /^\\d{15,20}$/;
+const profilePath = '/' + location.pathname.split('/')[1];
+
+// Busca un id de video en objetos de props (item.id, video.id...) con profundidad limitada
+const searchProps = (value, depth) => {
+    if (!value || typeof value !== 'object' || depth > 3) return null;
+    for (const key of ['id', 'videoId', 'itemId', 'awemeId']) {
+        const candidate = value[key];
+        if ((typeof candidate === 'string' || typeof candidate === 'number') && ID_PATTERN.test(String(candidate))) {
+            return String(candidate);
+        }
+    }
+    for (const key of ['item', 'video', 'data', 'itemInfo', 'itemStruct', 'post']) {
+        const found = searchProps(value[key], depth + 1);
+        if (found) return found;
+    }
+    return null;
+};
+
+// Id del video a partir de atributos data-* o de las props/fiber de React, sin navegar
+const findVideoId = (tile) => {
+    const nodes = [tile, ...tile.querySelectorAll('*')].slice(0, 60);
+    for (const node of nodes) {
+        for (const attribute of node.attributes || []) {
+            if (attribute.name.startsWith('data-') || attribute.name === 'id') {
+                const match = attribute.value.match(/\\d{15,20}/);
+                if (match) return match[0];
+            }
+        }
+    }
+    for (const node of nodes.slice(0, 10)) {
+        const fiberKey = Object.keys(node).find(key => key.startsWith('__reactFiber'));
+        let fiber = fiberKey ? node[fiberKey] : null;
+        for (let level = 0; fiber && level < 15; level++, fiber = fiber.return) {
+            const found = searchProps(fiber.memoizedProps, 0);
+            if (found) return found;
+        }
+        const propsKey = Object.keys(node).find(key => key.startsWith('__reactProps'));
+        const found = propsKey ? searchProps(node[propsKey], 0) : null;
+        if (found) return found;
+    }
+    return null;
+};
+
+for (let i = 0; i < tiles.length && i < limit; i++) {
+    const tile = tiles[i];
+    let href = null;
+    
+    // Métodos 1 y 2: enlace dentro de la miniatura
+    const link = tile.querySelector('a[href]');
+    if (link) href = link.href;
+    
+    // Método 3: construir la URL con el id del video de los atributos o props de React
+    if (!href) {
+        const videoId = findVideoId(tile);
+        if (videoId) href = location.origin + profilePath + '/video/' + videoId;
+    }
+    
+    // Método 4: enlace en los padres (hasta 3 niveles), solo mientras el padre envuelva esta miniatura
+    // y un único enlace; un ancestro más amplio de la cuadrícula daría el enlace de una vecina
+    let parent = tile.parentElement;
+    for (let level = 0; !href && parent && level < 3; level++) {
+        const parentLinks = parent.querySelectorAll('a[href]');
+        if (parent.querySelectorAll(arguments[0]).length > 1 || parentLinks.length > 1) break;
+        if (parentLinks.length === 1 && parentLinks[0].href.includes('tiktok.com')) href = parentLinks[0].href;
+        parent = parent.parentElement;
+    }
+    
+    let views = '';
+    for (const selector of viewsSelectors) {
+        const element = tile.querySelector(selector);
+        const text = element ? element.innerText.trim() : '';
+        if (text && text !== '0') {
+            views = text;
+            break;
+        }
+    }
+    
+    // Identificador del nodo, último recurso para deduplicar una miniatura sin enlace ni portada
+    if (!tile.dataset.scraperTile) {
+        window.__scraperTileSeq = (window.__scraperTileSeq || 0) + 1;
+        tile.dataset.scraperTile = String(window.__scraperTileSeq);
+    }
     
-    return video_count, video_selector
+    // Ruta de la portada: identifica la miniatura aunque la cuadrícula se vuelva a montar (virtualización,
+    // vuelta atrás o recarga), cuando el contador de nodos ya no sirve
+    const image = tile.querySelector('img');
+    const thumb = image && image.src.startsWith('http') ? new URL(image.src).pathname : null;
+    
+    results.push({index: i, href: href, views: views, key: href || thumb || 'tile-' + tile.dataset.scraperTile, thumb: thumb});
+}
+return results;
+"""
 
-def extract_videos_from_profile(username, max_videos):
-    """Extrae las URLs de los videos de un perfil de TikTok."""
-    chrome_options = set_chrome_options()
-    driver = webdriver.Chrome(options=chrome_options)
-    video_urls = []
-    videos_data = []
+# Devuelve la miniatura montada cuya portada tiene la ruta indicada (null si no está en el DOM)
+FIND_TILE_BY_THUMB_JS = """
+const [selector, thumb] = arguments;
+for (const tile of document.querySelectorAll(selector)) {
+    const image = tile.querySelector('img');
+    if (image && image.src.startsWith('http') && new URL(image.src).pathname === thumb) return tile;
+}
+return null;
+"""
+
+# Pulsa una miniatura, captura la URL que el SPA publica con pushState y vuelve atrás sin recargar
+HISTORY_CAPTURE_JS = """
+const [selector, index, timeoutMs, done] = arguments;
+const tile = document.querySelectorAll(selector)[index];
+if (!tile) {
+    done(null);
+    return;
+}
+
+const startUrl = location.href;
+const originalPush = history.pushState;
+let finished = false;
+let pushes = 0;
+let timer = null;
+
+const finish = (url) => {
+    if (finished) return;
+    finished = true;
+    history.pushState = originalPush;
+    clearTimeout(timer);
+    if (pushes) {
+        // Volver al perfil con el historial del SPA (mismo documento, sin recarga)
+        window.addEventListener('popstate', () => setTimeout(() => done(url), 300), {once: true});
+        history.go(-pushes);
+    } else {
+        done(url);
+    }
+};
+
+history.pushState = function(state, title, url) {
+    const result = originalPush.apply(history, arguments);
+    pushes += 1;
+    // Solo vale la URL de un video; otros pushState (filtros, modales) no identifican la miniatura
+    const target = url ? new URL(url, startUrl) : null;
+    if (target && target.pathname.includes('/video/')) finish(target.href);
+    return result;
+};
+timer = setTimeout(() => finish(null), timeoutMs);
+(tile.querySelector('a, [role="link"], img') || tile).click();
+"""
+
+def harvest_tiles(driver, video_selector, max_videos=None):
+    """Obtiene href, vistas, índice y clave de las miniaturas montadas con una sola llamada al navegador."""
+    try:
+        return driver.execute_script(HARVEST_TILES_JS, video_selector, TILE_VIEWS_SELECTORS, max_videos) or []
+    except Exception as e:
+        print(f"Error al recolectar las miniaturas: {str(e)}")
+        return []
+
+def resolve_tile_url_via_history(driver, video_selector, index, timeout=3):
+    """Obtiene la URL de una miniatura sin enlace interceptando pushState. Devuelve (url, navegó)."""
+    try:
+        url = driver.execute_async_script(HISTORY_CAPTURE_JS, video_selector, index, int(timeout * 1000))
+        return (url if url and "/video/" in url else None), False
+    except Exception:
+        # El clic provocó una navegación real: la página actual es la del video
+        try:
+            current_url = driver.current_url
+            if "/video/" in current_url:
+                return current_url, True
+        except Exception:
+            pass
+        return None, False
+
+def find_tile_by_thumb(driver, video_selector, thumb, profile_url, max_scrolls=10):
+    """Localiza la miniatura por la ruta de su portada: primero en el DOM actual y, si la cuadrícula
+    ya la desmontó, recargando el perfil y bajando hasta que vuelva a aparecer."""
+    tile = driver.execute_script(FIND_TILE_BY_THUMB_JS, video_selector, thumb)
+    if tile:
+        return tile
+    driver.get(profile_url)
+    try:
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, video_selector)))
+    except TimeoutException:
+        time.sleep(3)
+    for _ in range(max_scrolls):
+        tile = driver.execute_script(FIND_TILE_BY_THUMB_JS, video_selector, thumb)
+        if tile:
+            return tile
+        driver.execute_script("window.scrollBy(0, window.innerHeight);")
+        wait_for_scroll_growth(driver, video_selector, SCROLL_WAIT_FLOOR, SCROLL_WAIT_CEILING, SCROLL_NETWORK_IDLE)
+    return None
+
+def resolve_tile_url_with_reload(driver, video_selector, thumb, profile_url):
+    """Último recurso: hace clic en la miniatura (buscada por su portada), lee la URL y recarga el perfil."""
+    video_url = None
+    try:
+        # El índice de la miniatura ya no vale: la cuadrícula virtualizada se vuelve a montar al volver atrás
+        tile = find_tile_by_thumb(driver, video_selector, thumb, profile_url)
+        if tile:
+            # Guardar la URL actual
+            current_url = driver.current_url
+            # Hacer clic en el elemento del video
+            tile.click()
+            # Esperar a que cambie la URL
+            WebDriverWait(driver, 5).until(lambda d: d.current_url != current_url)
+            # Obtener la nueva URL, solo si es la de un video
+            if "/video/" in driver.current_url:
+                video_url = driver.current_url
+    except Exception:
+        pass
     
+    # Volver a la página del perfil
+    driver.get(profile_url)
     try:
-        print("Inicializando navegador principal...")
-        
-        # Visitar primero la página principal para establecer cookies
-        driver.get("https://www.tiktok.com/")
-        time.sleep(random.uniform(3, 5))
-        
-        # Cerrar popups iniciales
-        close_popups(driver)
-        
-        profile_url = f"https://www.tiktok.com/@{username}"
-        print(f"Navegando a: {profile_url}")
-        driver.get(profile_url)
-        
-        # Verificar CAPTCHA inicial
+        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, video_selector)))
+    except TimeoutException:
+        time.sleep(3)
+    return video_url
+
+def open_profile(driver, username):
+    """Abre el perfil de TikTok, espera a que cargue y devuelve su URL."""
+    print("Inicializando navegador principal...")
+    
+    # Visitar primero la página principal para establecer cookies
+    driver.get("https://www.tiktok.com/")
+    time.sleep(random.uniform(3, 5))
+    
+    # Cerrar popups iniciales
+    close_popups(driver)
+    
+    profile_url = f"https://www.tiktok.com/@{username}"
+    print(f"Navegando a: {profile_url}")
+    driver.get(profile_url)
+    
+    # Verificar CAPTCHA inicial
+    check_for_captcha(driver)
+    
+    # Esperar a que se cargue el perfil y manejar la situación si no aparecen elementos
+    print("Esperando carga de la página de perfil...")
+    time.sleep(5)  # Añadir un tiempo de espera inicial
+    
+    # Intentar diferentes selectores para la carga de página
+    loaded = False
+    load_indicators = [
+        "div[data-e2e='user-post-item']",
+        "div.video-feed-item",
+        "div.tiktok-x6y88p-DivItemContainerV2",
+        "div[data-e2e='user-post-item-container']",
+        "div[data-e2e='user-profile-header']"
+    ]
+    
+    for indicator in SELECTORS.ordered('tiktok.profile.loaded', load_indicators):
+        try:
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, indicator))
+            )
+            SELECTORS.record('tiktok.profile.loaded', indicator, True)
+            loaded = True
+            print(f"Página cargada correctamente (indicador: {indicator})")
+            break
+        except TimeoutException:
+            SELECTORS.record('tiktok.profile.loaded', indicator, False)
+            continue
+    
+    if not loaded:
+        print("⚠️ No se detectaron indicadores de carga. Verificar visualmente.")
+        print("⚠️ Si la página no cargó, puede haber un CAPTCHA o cambios en la estructura de la página.")
         check_for_captcha(driver)
-        
-        # Esperar a que se cargue el perfil y manejar la situación si no aparecen elementos
-        print("Esperando carga de la página de perfil...")
-        time.sleep(5)  # Añadir un tiempo de espera inicial
-        
-        # Intentar diferentes selectores para la carga de página
-        loaded = False
-        load_indicators = [
-            "div[data-e2e='user-post-item']",
-            "div.video-feed-item",
-            "div.tiktok-x6y88p-DivItemContainerV2",
-            "div[data-e2e='user-post-item-container']",
-            "div[data-e2e='user-profile-header']"
-        ]
-        
-        for indicator in load_indicators:
-            try:
-                WebDriverWait(driver, 10).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, indicator))
-                )
-                loaded = True
-                print(f"Página cargada correctamente (indicador: {indicator})")
+        input("✅ Presiona Enter cuando la página haya cargado completamente o hayas resuelto cualquier CAPTCHA...")
+    
+    return profile_url
+
+def iter_videos(driver, profile_url, max_videos, state=None):
+    """Genera {'url', 'views'} de cada video del perfil en cuanto aparece durante el scroll.
+    Con `state` (CrawlState) solo entrega los videos nuevos o a refrescar y para en los ya conocidos."""
+    print("Comenzando a cargar videos mediante scroll...")
+    video_selector = find_video_selector(driver)
+    unresolved = []
+    seen_urls = set()
+    found = 0
+    
+    for tile in iter_tiles(driver, video_selector, max_videos=max_videos):
+        if tile['href'] and tile['href'].split('?')[0] in seen_urls:
+            continue
+        found += 1
+        # Métodos 1 a 5 ya resueltos durante el scroll (enlaces, atributos, props de React y pushState)
+        if not tile['href']:
+            unresolved.append((found, tile))
+            continue
+        seen_urls.add(tile['href'].split('?')[0])
+        if state and not state.check(tile['href']):
+            # Rastreo incremental: saltar los ya vistos y parar tras varios conocidos seguidos
+            if state.should_stop():
+                print(f"Se alcanzaron {state.consecutive_known} videos ya conocidos seguidos. Fin del rastreo incremental.")
                 break
-            except TimeoutException:
-                continue
-        
-        if not loaded:
-            print("⚠️ No se detectaron indicadores de carga. Verificar visualmente.")
-            print("⚠️ Si la página no cargó, puede haber un CAPTCHA o cambios en la estructura de la página.")
-            check_for_captcha(driver)
-            input("✅ Presiona Enter cuando la página haya cargado completamente o hayas resuelto cualquier CAPTCHA...")
+            continue
+        views_count = convert_count_to_number(tile['views'])
+        print(f"Video {found}: {tile['href']} - Vistas: {views_count}")
+        yield {'url': tile['href'], 'views': views_count}
+    
+    if not found:
+        print("❌ No se encontraron videos en el perfil o el selector no es válido.")
+    
+    transferred = get_transferred_bytes(driver)
+    if transferred is not None:
+        print(f"📦 Bytes transferidos en el perfil: {transferred / 1024:.1f} KB")
+    
+    # Último recurso, tras el scroll: clic y recarga del perfil, una sola vez por perfil
+    reload_used = False
+    for position, tile in unresolved:
+        video_url = None
+        if not reload_used and tile.get('thumb'):
+            reload_used = True
+            print(f"Recargando el perfil para resolver el video {position} (último recurso)")
+            try:
+                video_url = resolve_tile_url_with_reload(driver, video_selector, tile['thumb'], profile_url)
+            except Exception as e:
+                print(f"Error al extraer datos del video {position}: {str(e)}")
         
-        print("Comenzando a cargar videos mediante scroll...")
-        video_count, video_selector = scroll_page(driver)
+        # Si no se pudo obtener la URL, generar un mensaje de error y continuar
+        if not video_url:
+            print(f"❌ No se pudo extraer la URL del video {position}")
+            continue
+        # Una URL ya listada significa que el clic abrió otra miniatura
+        if video_url.split('?')[0] in seen_urls:
+            print(f"❌ La URL resuelta para el video {position} ya estaba en la lista: {video_url}")
+            continue
+        seen_urls.add(video_url.split('?')[0])
+        if state and not state.check(video_url):
+            continue
         
-        # Obtener todas las URLs de videos y sus vistas
-        video_elements = driver.find_elements(By.CSS_SELECTOR, video_selector)
+        views_count = convert_count_to_number(tile['views'])
+        print(f"Video {position}: {video_url} - Vistas: {views_count}")
+        yield {'url': video_url, 'views': views_count}
+
+def extract_videos_from_profile(username, max_videos, lean=False, profile_dir=None, backend="selenium", state=None):
+    """Extrae las URLs de los videos de un perfil de TikTok."""
+    driver = create_driver(lean, profile_dir, backend)
+    video_urls = []
+    videos_data = []
+    
+    try:
+        profile_url = open_profile(driver, username)
         
-        # Si se encontraron videos, procesarlos
-        if video_elements:
-            for i, video_element in enumerate(video_elements):
-                if i >= max_videos:
-                    break
-                    
-                try:
-                    # Intentar extraer URL del video de diferentes maneras
-                    video_url = None
-                    
-                    # Método 1: Buscar un enlace directo dentro del elemento
-                    try:
-                        video_link_element = video_element.find_element(By.TAG_NAME, "a")
-                        video_url = video_link_element.get_attribute("href")
-                    except (NoSuchElementException, StaleElementReferenceException):
-                        pass
-                    
-                    # Método 2: Buscar cualquier enlace en un subelemento
-                    if not video_url:
-                        try:
-                            links = video_element.find_elements(By.CSS_SELECTOR, "a[href*='tiktok.com']")
-                            if links:
-                                video_url = links[0].get_attribute("href")
-                        except (NoSuchElementException, StaleElementReferenceException):
-                            pass
-                    
-                    # Método 3: Usar el enlace del div padre si es que existe
-                    if not video_url:
-                        try:
-                            # Subir a los padres para encontrar un enlace
-                            parent = driver.execute_script("return arguments[0].parentNode;", video_element)
-                            for _ in range(3):  # Intentar con varios niveles de padres
-                                try:
-                                    parent_links = parent.find_elements(By.TAG_NAME, "a")
-                                    if parent_links:
-                                        video_url = parent_links[0].get_attribute("href")
-                                        if video_url and "tiktok.com" in video_url:
-                                            break
-                                    parent = driver.execute_script("return arguments[0].parentNode;", parent)
-                                except:
-                                    break
-                        except:
-                            pass
-                    
-                    # Método 4: Hacer clic en el elemento y obtener la URL de la nueva página
-                    if not video_url:
-                        try:
-                            # Guardar la URL actual
-                            current_url = driver.current_url
-                            # Hacer clic en el elemento del video
-                            video_element.click()
-                            # Esperar a que cambie la URL
-                            WebDriverWait(driver, 5).until(lambda d: d.current_url != current_url)
-                            # Obtener la nueva URL
-                            video_url = driver.current_url
-                            # Volver a la página del perfil
-                            driver.get(profile_url)
-                            # Esperar a que la página cargue nuevamente
-                            WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.CSS_SELECTOR, video_selector)))
-                            # Obtener la lista actualizada de videos
-                            video_elements = driver.find_elements(By.CSS_SELECTOR, video_selector)
-                        except:
-                            # Si algo falla, volver a la página de perfil
-                            driver.get(profile_url)
-                            time.sleep(3)
-                            video_elements = driver.find_elements(By.CSS_SELECTOR, video_selector)
-                    
-                    # Si no se pudo obtener la URL, generar un mensaje de error y continuar
-                    if not video_url:
-                        print(f"❌ No se pudo extraer la URL del video {i+1}")
-                        continue
-                    
-                    # Extraer vistas del video
-                    views_count = 0
-                    try:
-                        views_selectors = [
-                            "strong[data-e2e='video-views']", 
-                            "span[data-e2e='video-views']",
-                            "strong.video-count", 
-                            "span.video-count"
-                        ]
-                        
-                        for selector in views_selectors:
-                            try:
-                                views_elements = video_element.find_elements(By.CSS_SELECTOR, selector)
-                                if views_elements:
-                                    views_text = views_elements[0].text
-                                    views_count = convert_count_to_number(views_text)
-                                    if views_count > 0:
-                                        break
-                            except:
-                                continue
-                    except Exception as e:
-                        print(f"Error al extraer las vistas: {str(e)}")
-                    
-                    # Añadir a las listas
-                    print(f"Video {i+1}: {video_url} - Vistas: {views_count}")
-                    video_urls.append(video_url)
-                    videos_data.append({
-                        'url': video_url,
-                        'views': views_count
-                    })
-                except Exception as e:
-                    print(f"Error al extraer datos del video {i+1}: {str(e)}")
-        else:
-            print("❌ No se encontraron videos en el perfil o el selector no es válido.")
+        crawl_start = time.perf_counter()
+        for video_data in iter_videos(driver, profile_url, max_videos, state):
+            if not videos_data:
+                print(f"Primer video a los {time.perf_counter() - crawl_start:.1f} s")
+            video_urls.append(video_data['url'])
+            videos_data.append(video_data)
             
     except Exception as e:
         print(f"Error al extraer videos del perfil: {str(e)}")
@@ -423,6 +801,184 @@ def extract_videos_from_profile(username, max_videos):
                 driver.quit()
             return None, video_urls, videos_data
 
+# Cadenas de selectores por campo, en orden de preferencia
+VIDEO_FIELD_SPEC = {
+    'description': [
+        "div[data-e2e='browse-video-desc']",
+        "span[data-e2e='video-desc']",
+        ".video-meta-description",
+        "h1.tiktok-1eqe95p-H1VideoTitle",
+        "div.tiktok-1wrhn5c-DivContainer"
+    ],
+    'date': [
+        "span[data-e2e='browser-nickname'] + span",
+        "span[data-e2e='video-create-time']",
+        ".video-meta-date",
+        "span.tiktok-14hp4um-SpanSubInfoText"
+    ],
+    'likes': [
+        "strong[data-e2e='like-count']",
+        "span[data-e2e='like-count']",
+        "strong.engagement-count-like",
+        "span.video-meta-like"
+    ],
+    'comments': [
+        "strong[data-e2e='comment-count']",
+        "span[data-e2e='comment-count']",
+        "strong.engagement-count-comment",
+        "span.video-meta-comment"
+    ],
+    'views': [
+        "strong[data-e2e='video-views']",
+        "span[data-e2e='video-views']",
+        ".video-meta-views",
+        "strong.video-count"
+    ]
+}
+
+# Evalúa todas las cadenas de selectores en la página y devuelve el primer texto no vacío de cada campo
+EXTRACT_FIELDS_JS = """
+const spec = arguments[0];
+const result = {};
+
+for (const field in spec) {
+    result[field] = {text: '', selector: null};
+    for (const selector of spec[field]) {
+        let element = null;
+        try {
+            element = document.querySelector(selector);
+        } catch (e) {
+            continue;
+        }
+        const text = element ? (element.innerText || '').trim() : '';
+        if (text && text !== '0') {
+            result[field] = {text: text, selector: selector};
+            break;
+        }
+    }
+}
+return result;
+"""
+
+def extract_fields(driver, spec):
+    """Devuelve {campo: {'text', 'selector'}} evaluando todas las cadenas de selectores en un solo script."""
+    try:
+        fields = driver.execute_script(EXTRACT_FIELDS_JS, spec) or {}
+    except Exception as e:
+        print(f"Error al extraer los campos del video: {str(e)}")
+        fields = {}
+    return {field: fields.get(field) or {'text': '', 'selector': None} for field in spec}
+
+# Devuelve el texto del JSON de hidratación que TikTok incrusta en la página (uno de los tres formatos conocidos)
+HYDRATION_JS = """
+for (const id of ['__UNIVERSAL_DATA_FOR_REHYDRATION__', 'SIGI_STATE', '__NEXT_DATA__']) {
+    const script = document.getElementById(id);
+    if (script && script.textContent) return {source: id, text: script.textContent};
+}
+return null;
+"""
+
+def find_hydration_item(source, data, video_url):
+    """Localiza el objeto del video (itemStruct) dentro del JSON de hidratación.
+    Devuelve None si describe otro video (p. ej. tras una navegación del SPA) para que se use el DOM."""
+    video_id = video_url.split('?')[0].rstrip('/').split('/')[-1]
+    item = None
+    if source == '__UNIVERSAL_DATA_FOR_REHYDRATION__':
+        detail = data.get('__DEFAULT_SCOPE__', {}).get('webapp.video-detail', {})
+        item = detail.get('itemInfo', {}).get('itemStruct')
+    elif source == 'SIGI_STATE':
+        item = data.get('ItemModule', {}).get(video_id)
+    elif source == '__NEXT_DATA__':
+        item = data.get('props', {}).get('pageProps', {}).get('itemInfo', {}).get('itemStruct')
+    if not item or str(item.get('id', '')) != video_id:
+        return None
+    return item
+
+def extract_hydration_fields(driver, video_url):
+    """Lee el JSON de hidratación una vez y devuelve descripción, fecha y conteos exactos (o None)."""
+    try:
+        blob = driver.execute_script(HYDRATION_JS)
+        if not blob:
+            return None
+        item = find_hydration_item(blob['source'], json.loads(blob['text']), video_url)
+        if not item:
+            return None
+        
+        stats = item.get('stats') or {}
+        stats_v2 = item.get('statsV2') or {}
+        def count(key):
+            # statsV2 trae los conteos como texto y sin redondear cuando superan los 32 bits
+            value = stats_v2.get(key, stats.get(key))
+            return int(value) if value not in (None, '') else 0
+        
+        create_time = item.get('createTime')
+        date = ''
+        if create_time:
+            date = datetime.fromtimestamp(int(create_time), tz=timezone.utc).isoformat()
+        
+        return {
+            'description': item.get('desc', ''),
+            'date': date,
+            'likes': count('diggCount'),
+            'comments': count('commentCount'),
+            'views': count('playCount')
+        }
+    except Exception as e:
+        print(f"No se pudo leer el JSON de hidratación: {str(e)}")
+        return None
+
+def extract_video_fields_from_dom(driver, video_data):
+    """Respaldo con selectores del DOM cuando la página no trae el JSON de hidratación."""
+    # Esperar a que cargue el video con diferentes posibles elementos
+    video_loaded = False
+    video_selectors = [
+        ".tiktok-1itcwxg-ImgPoster", 
+        "video", 
+        "div[data-e2e='browse-video']", 
+        "div[data-e2e='video-container']",
+        "canvas[data-e2e='browse-video']",
+        "div.css-1us9sro-DivAside"
+    ]
+    
+    for selector in SELECTORS.ordered('tiktok.video.loaded', video_selectors):
+        try:
+            WebDriverWait(driver, 5).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
+            )
+            SELECTORS.record('tiktok.video.loaded', selector, True)
+            video_loaded = True
+            print(f"Video cargado con selector: {selector}")
+            break
+        except TimeoutException:
+            SELECTORS.record('tiktok.video.loaded', selector, False)
+            continue
+    
+    if not video_loaded:
+        print(f"⚠️ No se detectaron elementos de video. Esperando carga manual...")
+        check_for_captcha(driver)
+        input("✅ Presiona Enter cuando el video haya cargado o hayas resuelto cualquier CAPTCHA...")
+    
+    # Simulación de comportamiento humano
+    time.sleep(random.uniform(1, 3))
+    human_like_scroll(driver, random.randint(100, 300))  # Scroll suave hacia abajo
+    
+    # Extraer todos los campos del video con una sola llamada al navegador,
+    # probando primero en cada campo el selector que más acierta
+    spec = {field: SELECTORS.ordered(f'tiktok.video.{field}', selectors) for field, selectors in VIDEO_FIELD_SPEC.items()}
+    fields = extract_fields(driver, spec)
+    for field, selectors in spec.items():
+        SELECTORS.record_chain(f'tiktok.video.{field}', selectors, fields[field]['selector'])
+    description = fields['description']['text']
+    date = fields['date']['text']
+    likes_count = convert_count_to_number(fields['likes']['text'])
+    comments_count = convert_count_to_number(fields['comments']['text'])
+    
+    # Si no tenemos las vistas del feed, obtenerlas del video individual
+    if 'views' not in video_data or video_data['views'] == 0:
+        video_data['views'] = convert_count_to_number(fields['views']['text'])
+    
+    return description, date, likes_count, comments_count
+
 def process_video(driver, video_url, video_data, index, total):
     """Procesa un video individual y extrae sus datos. Reutiliza el driver existente."""
     try:
@@ -435,153 +991,19 @@ def process_video(driver, video_url, video_data, index, total):
         # Cerrar cualquier popup que aparezca
         close_popups(driver)
         
-        # Esperar a que cargue el video con diferentes posibles elementos
-        video_loaded = False
-        video_selectors = [
-            ".tiktok-1itcwxg-ImgPoster", 
-            "video", 
-            "div[data-e2e='browse-video']", 
-            "div[data-e2e='video-container']",
-            "canvas[data-e2e='browse-video']",
-            "div.css-1us9sro-DivAside"
-        ]
-        
-        for selector in video_selectors:
-            try:
-                WebDriverWait(driver, 5).until(
-                    EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-                )
-                video_loaded = True
-                print(f"Video cargado con selector: {selector}")
-                break
-            except TimeoutException:
-                continue
-        
-        if not video_loaded:
-            print(f"⚠️ No se detectaron elementos de video. Esperando carga manual...")
-            check_for_captcha(driver)
-            input("✅ Presiona Enter cuando el video haya cargado o hayas resuelto cualquier CAPTCHA...")
-        
-        # Simulación de comportamiento humano
-        time.sleep(random.uniform(1, 3))
-        human_like_scroll(driver, random.randint(100, 300))  # Scroll suave hacia abajo
-        
-        # Extraer datos adicionales del video
-        try:
-            # Descripción del video (probando diferentes selectores)
-            description = ""
-            description_selectors = [
-                "div[data-e2e='browse-video-desc']", 
-                "span[data-e2e='video-desc']", 
-                ".video-meta-description",
-                "h1.tiktok-1eqe95p-H1VideoTitle",
-                "div.tiktok-1wrhn5c-DivContainer"
-            ]
-            
-            for selector in description_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        description = elements[0].text
-                        if description:
-                            break
-                except:
-                    pass
-        except:
-            description = ""
-        
-        try:
-            # Fecha de publicación (probando diferentes selectores)
-            date = ""
-            date_selectors = [
-                "span[data-e2e='browser-nickname'] + span", 
-                "span[data-e2e='video-create-time']", 
-                ".video-meta-date",
-                "span.tiktok-14hp4um-SpanSubInfoText"
-            ]
-            
-            for selector in date_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        date = elements[0].text
-                        if date:
-                            break
-                except:
-                    pass
-        except:
-            date = ""
-        
-        try:
-            # Número de likes
-            likes_count = 0
-            likes_selectors = [
-                "strong[data-e2e='like-count']", 
-                "span[data-e2e='like-count']",
-                "strong.engagement-count-like",
-                "span.video-meta-like"
-            ]
-            
-            for selector in likes_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        likes = elements[0].text
-                        likes_count = convert_count_to_number(likes)
-                        if likes_count > 0:
-                            break
-                except:
-                    pass
-        except:
-            likes_count = 0
-        
-        try:
-            # Número de comentarios
-            comments_count = 0
-            comments_selectors = [
-                "strong[data-e2e='comment-count']", 
-                "span[data-e2e='comment-count']",
-                "strong.engagement-count-comment",
-                "span.video-meta-comment"
-            ]
-            
-            for selector in comments_selectors:
-                try:
-                    elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                    if elements:
-                        comments = elements[0].text
-                        comments_count = convert_count_to_number(comments)
-                        if comments_count > 0:
-                            break
-                except:
-                    pass
-        except:
-            comments_count = 0
-        
-        try:
-            # Si no tenemos las vistas del feed, obtenerlas del video individual
-            if 'views' not in video_data or video_data['views'] == 0:
-                views_selectors = [
-                    "strong[data-e2e='video-views']", 
-                    "span[data-e2e='video-views']", 
-                    ".video-meta-views",
-                    "strong.video-count"
-                ]
-                
-                for selector in views_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            views_text = elements[0].text
-                            view_count = convert_count_to_number(views_text)
-                            if view_count > 0:
-                                video_data['views'] = view_count
-                                break
-                    except:
-                        pass
-        except:
-            if 'views' not in video_data:
-                video_data['views'] = 0
+        # Camino rápido: todos los campos salen del JSON de hidratación (una lectura y un parseo local)
+        hydrated = extract_hydration_fields(driver, video_url)
+        if hydrated:
+            print("Datos leídos del JSON de hidratación")
+            description = hydrated['description']
+            date = hydrated['date']
+            likes_count = hydrated['likes']
+            comments_count = hydrated['comments']
+            # Las vistas exactas sustituyen al valor redondeado del perfil ("13.3K")
+            if hydrated['views']:
+                video_data['views'] = hydrated['views']
+        else:
+            description, date, likes_count, comments_count = extract_video_fields_from_dom(driver, video_data)
         
         # Completar el diccionario con todos los datos
         video_data.update({
@@ -599,6 +1021,10 @@ def process_video(driver, video_url, video_data, index, total):
         print(f"   Comentarios: {comments_count}")
         print(f"   Vistas: {video_data['views']}")
         
+        transferred = get_transferred_bytes(driver)
+        if transferred is not None:
+            print(f"   Bytes transferidos: {transferred / 1024:.1f} KB")
+        
         # Simular comportamiento humano entre videos
         time.sleep(random.uniform(2, 4))
         
@@ -627,88 +1053,460 @@ def save_to_csv(data, filename):
     except Exception as e:
         print(f"❌ Error al guardar los datos: {str(e)}")
 
-def main():
-    print("=" * 60)
-    print("   EXTRACTOR DE DATOS DE VIDEOS DE TIKTOK")
-    print("=" * 60)
+class DriverSupervisor:
+    """Vigila páginas servidas y memoria del renderer, y recicla el navegador al superar los umbrales."""
     
-    username = input("📱 Introduce la cuenta de TikTok: ")
-    csv_filename = input("📄 Nombre del archivo CSV (sin extensión): ")
-    max_videos = int(input("🔢 Número máximo de videos a extraer (recomendado 50-100): "))
+    def __init__(self, driver, factory, max_pages=RECYCLE_MAX_PAGES, max_heap_mb=RECYCLE_MAX_HEAP_MB):
+        self.driver = driver
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_heap_mb = max_heap_mb
+        self.pages_served = 0
+        self.recycles = 0
+        self._enable_metrics()
     
-    print("\n🚀 Iniciando extracción de datos...")
+    def _enable_metrics(self):
+        try:
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+        except Exception:
+            pass
     
-    # Obtener URLs de videos y datos básicos, junto con el driver principal
-    main_driver, video_urls, videos_data = extract_videos_from_profile(username, max_videos)
+    def renderer_memory_mb(self):
+        """Memoria del heap JS de la página según Performance.getMetrics (None si no está disponible)."""
+        try:
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+        except Exception:
+            return None
+        values = {metric["name"]: metric["value"] for metric in metrics}
+        return values.get("JSHeapTotalSize", 0) / (1024 * 1024)
     
-    print(f"🔍 Total de videos encontrados: {len(video_urls)}")
+    def page_served(self):
+        self.pages_served += 1
     
-    # Procesar videos secuencialmente para evitar múltiples CAPTCHAs
-    if video_urls:
-        print(f"Procesando {len(video_urls)} videos secuencialmente...")
-        
-        results = []
+    def needs_recycle(self):
+        if self.pages_served >= self.max_pages:
+            print(f"♻️ {self.pages_served} páginas servidas, reciclando el navegador...")
+            return True
+        memory = self.renderer_memory_mb()
+        if memory is not None and memory >= self.max_heap_mb:
+            print(f"♻️ Memoria del renderer en {memory:.0f} MB, reciclando el navegador...")
+            return True
+        return False
+    
+    def checkout(self):
+        """Devuelve el driver para la próxima página, reciclándolo antes si hace falta."""
+        if self.needs_recycle():
+            self.recycle()
+        return self.driver
+    
+    def recycle(self):
+        """Cierra el navegador, abre uno nuevo y restaura las cookies de la sesión."""
+        cookies = []
         try:
-            if main_driver:
-                # Pausa para revisar cualquier CAPTCHA pendiente antes de continuar
-                check_for_captcha(main_driver)
-                
-                # Configurar tiempo entre requests para evitar detección
-                min_delay = 5  # Tiempo mínimo entre videos (segundos)
-                max_delay = 12  # Tiempo máximo entre videos (segundos)
-                
-                # Contador para pausas más largas
-                long_pause_counter = 0
-                
-                for i, (url, data) in enumerate(zip(video_urls, videos_data)):
+            cookies = self.driver.get_cookies()
+        except Exception:
+            pass
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+        
+        self.driver = self.factory()
+        self._enable_metrics()
+        if cookies:
+            try:
+                self.driver.get("https://www.tiktok.com/")
+                for cookie in cookies:
                     try:
-                        # Añadir una pausa aleatoria entre cada solicitud
-                        if i > 0:
-                            delay = random.uniform(min_delay, max_delay)
-                            print(f"Esperando {delay:.1f} segundos antes del siguiente video...")
-                            time.sleep(delay)
-                        
-                        # Procesar el video con el driver principal
-                        result = process_video(main_driver, url, data, i+1, len(video_urls))
-                        if result:
-                            results.append(result)
-                        
-                        # Incrementar contador
-                        long_pause_counter += 1
-                        
-                        # De vez en cuando hacer una pausa más larga para parecer humano
-                        if long_pause_counter >= 5:
-                            long_pause = random.uniform(15, 30)
-                            print(f"Haciendo una pausa más larga de {long_pause:.1f} segundos...")
-                            time.sleep(long_pause)
-                            long_pause_counter = 0
-                        
-                        # Guardar resultados parciales cada 10 videos
-                        if i > 0 and i % 10 == 0:
-                            save_to_csv(results, f"{csv_filename}_parcial")
-                            print(f"💾 Guardado parcial realizado ({i} videos procesados)")
-                    
-                    except Exception as e:
-                        print(f"Error al procesar video {i+1}: {str(e)}")
-                        # Intentar continuar con el siguiente video
+                        self.driver.add_cookie(cookie)
+                    except Exception:
                         continue
+            except Exception as e:
+                print(f"⚠️ No se pudo restaurar la sesión tras reciclar: {str(e)}")
+        
+        self.pages_served = 0
+        self.recycles += 1
+        print(f"♻️ Navegador reciclado ({self.recycles} en total)")
+
+class DomainRateLimiter:
+    """Reparte turnos de acceso a un dominio entre varios workers respetando un intervalo mínimo."""
+    
+    def __init__(self, min_interval=DOMAIN_MIN_INTERVAL):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self):
+        """Bloquea hasta que le toque el siguiente turno al hilo que llama."""
+        with self._lock:
+            slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = slot + self.min_interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+def new_worker_supervisor(worker_id, main_driver, lean=False, backend="selenium", profile_dir=None):
+    """Abre el navegador de un worker adicional bajo su supervisor, con el perfil ya clonado `profile_dir`
+    o uno nuevo. Devuelve (supervisor, carpeta de perfil)."""
+    if backend == "cdp":
+        # Con el motor CDP los workers son pestañas del mismo navegador y bucle de eventos
+        def new_tab():
+            tab = main_driver.engine.new_driver()
+            if lean:
+                enable_lean_mode(tab)
+            return tab
+        return DriverSupervisor(new_tab(), new_tab), None
+    
+    # Cada worker usa su propio navegador y un perfil clonado de la plantilla
+    profile_dir = profile_dir or create_worker_profile(worker_id)
+    try:
+        driver = create_driver(lean, profile_dir)
+    except Exception:
+        # Sin navegador nadie más limpiaría el perfil clonado
+        remove_worker_profile(profile_dir)
+        raise
+    return DriverSupervisor(driver, lambda: create_driver(lean, profile_dir)), profile_dir
+
+def process_videos_sharded(main_driver, video_urls, videos_data, workers, csv_filename, lean=False, rate_limiter=None, backend="selenium", main_profile_dir=None, worker_profiles=None):
+    """Reparte los videos entre varios navegadores y devuelve los resultados en el orden original.
+    `worker_profiles` da los perfiles ya clonados por worker (ver clone_worker_profiles)."""
+    worker_profiles = worker_profiles or {}
+    rate_limiter = rate_limiter or DomainRateLimiter()
+    total = len(video_urls)
+    results = [None] * total
+    completed = [0]
+    results_lock = threading.Lock()
+    
+    # Reparto round-robin: el worker k procesa los índices k, k+N, k+2N...
+    shards = [list(range(k, total, workers)) for k in range(workers)]
+    
+    def run_shard(worker_id, indices):
+        profile_dir = None
+        supervisor = None
+        # Solo se cierran los navegadores que crea este worker; el principal es del llamador
+        owns_driver = False
+        try:
+            if backend == "cdp" or worker_id > 0:
+                supervisor, profile_dir = new_worker_supervisor(worker_id, main_driver, lean, backend, worker_profiles.get(worker_id))
+                owns_driver = True
             else:
-                print("❌ No se pudo inicializar el navegador principal correctamente.")
-        except Exception as e:
-            print(f"Error durante el procesamiento: {str(e)}")
+                supervisor = DriverSupervisor(main_driver, lambda: create_driver(lean, main_profile_dir))
+            
+            long_pause_counter = 0
+            for position, i in enumerate(indices):
+                try:
+                    if position > 0:
+                        time.sleep(random.uniform(MIN_VIDEO_DELAY, MAX_VIDEO_DELAY))
+                    rate_limiter.wait()
+                    
+                    driver = supervisor.checkout()
+                    result = process_video(driver, video_urls[i], videos_data[i], i+1, total)
+                    supervisor.page_served()
+                    with results_lock:
+                        results[i] = result
+                        completed[0] += 1
+                        if completed[0] % 10 == 0:
+                            save_to_csv([r for r in results if r], f"{csv_filename}_parcial")
+                            print(f"💾 Guardado parcial realizado ({completed[0]} videos procesados)")
+                    
+                    long_pause_counter += 1
+                    if long_pause_counter >= 5:
+                        long_pause = random.uniform(15, 30)
+                        print(f"Worker {worker_id}: pausa más larga de {long_pause:.1f} segundos...")
+                        time.sleep(long_pause)
+                        long_pause_counter = 0
+                except Exception as e:
+                    print(f"Error al procesar video {i+1} en el worker {worker_id}: {str(e)}")
         finally:
+            if supervisor and (owns_driver or supervisor.driver is not main_driver):
+                supervisor.driver.quit()
+            if profile_dir:
+                remove_worker_profile(profile_dir)
+    
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_shard, k, shard) for k, shard in enumerate(shards) if shard]
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                print(f"❌ Error en un worker: {str(e)}")
+    
+    return [r for r in results if r]
+
+def mark_extracted(state, results):
+    """Marca como vistos en el rastreo incremental los videos cuyos datos se extrajeron."""
+    for result in results:
+        # Si falla, process_video devuelve los datos parciales (sin likes) y el video se reintentará
+        if 'likes' in result:
+            state.mark_seen(result['url'])
+
+def run_extraction(username, csv_filename, max_videos, lean=False, profile_dir=None, workers=1, backend="selenium",
+                   delta=False, stop_after=DELTA_STOP_AFTER, refresh_recent=0):
+    """Extrae y procesa los videos de una cuenta y guarda el CSV."""
+    # Rastreo incremental: videos vistos en la ejecución anterior de esta cuenta
+    state = CrawlState("tiktok", username, stop_after, refresh_recent) if delta else None
+    
+    # Los perfiles de los workers se clonan antes de que el navegador principal abra la plantilla
+    worker_profiles = clone_worker_profiles(range(1, workers)) if workers > 1 and backend != "cdp" else {}
+    try:
+        # Obtener URLs de videos y datos básicos, junto con el driver principal
+        main_driver, video_urls, videos_data = extract_videos_from_profile(username, max_videos, lean, profile_dir, backend, state)
+        
+        print(f"🔍 Total de videos encontrados: {len(video_urls)}")
+        
+        # Procesar videos secuencialmente (o repartidos entre workers) para evitar múltiples CAPTCHAs
+        if video_urls:
+            if workers > 1:
+                print(f"Procesando {len(video_urls)} videos con {workers} navegadores...")
+            else:
+                print(f"Procesando {len(video_urls)} videos secuencialmente...")
+            
+            results = []
+            supervisor = None
+            try:
+                if main_driver and workers > 1:
+                    # Pausa para revisar cualquier CAPTCHA pendiente antes de repartir los videos
+                    check_for_captcha(main_driver)
+                    results = process_videos_sharded(main_driver, video_urls, videos_data, workers, csv_filename, lean,
+                                                     backend=backend, main_profile_dir=profile_dir,
+                                                     worker_profiles=worker_profiles)
+                elif main_driver:
+                    # Pausa para revisar cualquier CAPTCHA pendiente antes de continuar
+                    check_for_captcha(main_driver)
+                    
+                    # Configurar tiempo entre requests para evitar detección
+                    min_delay = MIN_VIDEO_DELAY  # Tiempo mínimo entre videos (segundos)
+                    max_delay = MAX_VIDEO_DELAY  # Tiempo máximo entre videos (segundos)
+                    
+                    # Contador para pausas más largas
+                    long_pause_counter = 0
+                    
+                    # Recicla el navegador si crece demasiado y continúa desde el video actual
+                    supervisor = DriverSupervisor(main_driver, lambda: create_driver(lean, profile_dir, backend))
+                    
+                    for i, (url, data) in enumerate(zip(video_urls, videos_data)):
+                        try:
+                            # Añadir una pausa aleatoria entre cada solicitud
+                            if i > 0:
+                                delay = random.uniform(min_delay, max_delay)
+                                print(f"Esperando {delay:.1f} segundos antes del siguiente video...")
+                                time.sleep(delay)
+                            
+                            # Procesar el video con el driver principal (o su reemplazo tras reciclar)
+                            result = process_video(supervisor.checkout(), url, data, i+1, len(video_urls))
+                            supervisor.page_served()
+                            if result:
+                                results.append(result)
+                            
+                            # Incrementar contador
+                            long_pause_counter += 1
+                            
+                            # De vez en cuando hacer una pausa más larga para parecer humano
+                            if long_pause_counter >= 5:
+                                long_pause = random.uniform(15, 30)
+                                print(f"Haciendo una pausa más larga de {long_pause:.1f} segundos...")
+                                time.sleep(long_pause)
+                                long_pause_counter = 0
+                            
+                            # Guardar resultados parciales cada 10 videos
+                            if i > 0 and i % 10 == 0:
+                                save_to_csv(results, f"{csv_filename}_parcial")
+                                print(f"💾 Guardado parcial realizado ({i} videos procesados)")
+                        
+                        except Exception as e:
+                            print(f"Error al procesar video {i+1}: {str(e)}")
+                            # Intentar continuar con el siguiente video
+                            continue
+                else:
+                    print("❌ No se pudo inicializar el navegador principal correctamente.")
+            except Exception as e:
+                print(f"Error durante el procesamiento: {str(e)}")
+            finally:
+                if supervisor and supervisor.driver is not main_driver:
+                    supervisor.driver.quit()
+                elif main_driver:
+                    try:
+                        # Puede haberse cerrado ya si un worker lo recicló
+                        main_driver.quit()
+                        print("Navegador principal cerrado correctamente")
+                    except Exception:
+                        pass
+            
+            # Guardar resultados en CSV y el orden aprendido de los selectores
+            save_to_csv(results, csv_filename)
+            SELECTORS.save()
+            if state:
+                mark_extracted(state, results)
+                state.save()
+            print(f"🎉 Se procesaron exitosamente {len(results)} videos.")
+        elif state and state.known:
+            print("✅ No hay videos nuevos desde la última ejecución.")
             if main_driver:
                 main_driver.quit()
-                print("Navegador principal cerrado correctamente")
-        
-        # Guardar resultados en CSV
-        save_to_csv(results, csv_filename)
-        print(f"🎉 Se procesaron exitosamente {len(results)} videos.")
-    else:
-        print("❌ No se encontraron videos en el perfil.")
-        if main_driver:
+        else:
+            print("❌ No se encontraron videos en el perfil.")
+            if main_driver:
+                main_driver.quit()
+                print("Navegador cerrado")
+    finally:
+        # Perfiles que no llegaron a usarse (sin videos o sin navegador principal)
+        for worker_profile in worker_profiles.values():
+            remove_worker_profile(worker_profile)
+
+def run_pipeline(username, csv_filename, max_videos, lean=False, profile_dir=None, workers=2, backend="selenium",
+                 delta=False, stop_after=DELTA_STOP_AFTER, refresh_recent=0):
+    """Rastrea el perfil con el navegador principal mientras `workers` navegadores procesan los videos
+    que va encontrando, a través de una cola acotada."""
+    rate_limiter = DomainRateLimiter()
+    state = CrawlState("tiktok", username, stop_after, refresh_recent) if delta else None
+    work_queue = queue.Queue(maxsize=workers * PIPELINE_QUEUE_PER_WORKER)
+    results = {}
+    results_lock = threading.Lock()
+    # Los perfiles de los workers se clonan antes de que el navegador principal abra la plantilla
+    worker_profiles = clone_worker_profiles(range(1, workers + 1)) if backend != "cdp" else {}
+    try:
+        main_driver = create_driver(lean, profile_dir, backend)
+    except Exception:
+        for worker_profile in worker_profiles.values():
+            remove_worker_profile(worker_profile)
+        raise
+    
+    def detail_worker(worker_id):
+        supervisor = None
+        worker_profile = None
+        try:
+            supervisor, worker_profile = new_worker_supervisor(worker_id, main_driver, lean, backend, worker_profiles.get(worker_id))
+            processed = 0
+            while True:
+                item = work_queue.get()
+                if item is None:
+                    break
+                index, video_data = item
+                try:
+                    if processed > 0:
+                        time.sleep(random.uniform(MIN_VIDEO_DELAY, MAX_VIDEO_DELAY))
+                    rate_limiter.wait()
+                    
+                    # El total aún no se conoce mientras el rastreador sigue avanzando
+                    result = process_video(supervisor.checkout(), video_data['url'], video_data, index, max_videos)
+                    supervisor.page_served()
+                    processed += 1
+                    with results_lock:
+                        results[index] = result
+                        if len(results) % 10 == 0:
+                            save_to_csv([results[i] for i in sorted(results) if results[i]], f"{csv_filename}_parcial")
+                            print(f"💾 Guardado parcial realizado ({len(results)} videos procesados)")
+                except Exception as e:
+                    print(f"Error al procesar video {index} en el worker {worker_id}: {str(e)}")
+        finally:
+            if supervisor:
+                try:
+                    supervisor.driver.quit()
+                except Exception:
+                    pass
+            if worker_profile:
+                remove_worker_profile(worker_profile)
+    
+    def enqueue(item, futures):
+        """Pone un elemento en la cola esperando si está llena, salvo que ya no quede ningún worker vivo."""
+        while True:
+            try:
+                work_queue.put(item, timeout=1)
+                return
+            except queue.Full:
+                if all(future.done() for future in futures):
+                    raise RuntimeError("Todos los workers de detalle han terminado")
+    
+    found = 0
+    start = time.perf_counter()
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(detail_worker, k + 1) for k in range(workers)]
+            try:
+                profile_url = open_profile(main_driver, username)
+                for video_data in iter_videos(main_driver, profile_url, max_videos, state):
+                    found += 1
+                    enqueue((found, video_data), futures)
+            except Exception as e:
+                print(f"Error al rastrear el perfil: {str(e)}")
+            finally:
+                print(f"🔍 Rastreo terminado: {found} videos encontrados en {time.perf_counter() - start:.1f} s")
+                # Una marca de fin por worker para que terminen al vaciar la cola
+                for _ in futures:
+                    try:
+                        enqueue(None, futures)
+                    except RuntimeError:
+                        break
+            
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ Error en un worker: {str(e)}")
+    finally:
+        try:
             main_driver.quit()
-            print("Navegador cerrado")
+        except Exception:
+            pass
+        for worker_profile in worker_profiles.values():
+            remove_worker_profile(worker_profile)
+    
+    ordered = [results[i] for i in sorted(results) if results[i]]
+    save_to_csv(ordered, csv_filename)
+    SELECTORS.save()
+    if state:
+        mark_extracted(state, ordered)
+        state.save()
+    print(f"🎉 Se procesaron exitosamente {len(ordered)} videos en {time.perf_counter() - start:.1f} s.")
+
+def run_worker(worker_id, username, csv_filename, max_videos, lean=False, backend="selenium", **delta_options):
+    """Ejecuta una extracción completa en un perfil de Chrome exclusivo del worker."""
+    profile_dir = create_worker_profile(worker_id)
+    try:
+        print(f"👷 Worker {worker_id}: procesando @{username} (perfil {profile_dir})")
+        run_extraction(username, csv_filename, max_videos, lean, profile_dir, backend=backend, **delta_options)
+    finally:
+        remove_worker_profile(profile_dir)
+
+def main(workers=1, backend="selenium", pipeline=False, delta=False, stop_after=DELTA_STOP_AFTER, refresh_recent=0):
+    print("=" * 60)
+    print("   EXTRACTOR DE DATOS DE VIDEOS DE TIKTOK")
+    print("=" * 60)
+    
+    if workers > 1 or pipeline:
+        usernames = [u.strip() for u in input("📱 Introduce las cuentas de TikTok separadas por comas: ").split(",") if u.strip()]
+    else:
+        usernames = [input("📱 Introduce la cuenta de TikTok: ")]
+    csv_filename = input("📄 Nombre del archivo CSV (sin extensión): ")
+    max_videos = int(input("🔢 Número máximo de videos a extraer (recomendado 50-100): "))
+    lean = input("⚡ ¿Activar modo ligero (sin imágenes, media ni fuentes)? (s/n): ").lower() == 's'
+    
+    delta_options = {'delta': delta, 'stop_after': stop_after, 'refresh_recent': refresh_recent}
+    
+    print("\n🚀 Iniciando extracción de datos...")
+    
+    if pipeline:
+        # Cada cuenta: el rastreador alimenta a `workers` navegadores de detalle mientras hace scroll
+        for account in usernames:
+            csv_name = f"{csv_filename}_{account}" if len(usernames) > 1 else csv_filename
+            print(f"Pipeline para @{account} con {workers} workers de detalle...")
+            run_pipeline(account, csv_name, max_videos, lean, workers=workers, backend=backend, **delta_options)
+    elif workers > 1 and len(usernames) > 1:
+        # Cada cuenta se procesa en su propio navegador con un perfil clonado de la plantilla
+        print(f"Usando {workers} workers en paralelo para {len(usernames)} cuentas...")
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(run_worker, i + 1, account, f"{csv_filename}_{account}", max_videos, lean, backend, **delta_options)
+                for i, account in enumerate(usernames)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"❌ Error en un worker: {str(e)}")
+    else:
+        # Con una sola cuenta, los workers se reparten sus videos
+        run_extraction(usernames[0], csv_filename, max_videos, lean, workers=workers, backend=backend, **delta_options)
 
 def show_menu():
     """Muestra un menú de opciones para el usuario."""
@@ -722,6 +1520,20 @@ def show_menu():
     return option
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extractor de datos de videos de TikTok")
+    parser.add_argument("--workers", type=int, default=1, help="Número de navegadores en paralelo")
+    parser.add_argument("--backend", choices=["selenium", "cdp"], default="selenium",
+                        help="Motor del navegador: chromedriver o CDP asíncrono")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="Procesar los videos mientras se rastrea el perfil (--workers navegadores de detalle)")
+    parser.add_argument("--delta", action="store_true",
+                        help="Rastreo incremental: parar al llegar a videos ya vistos en la ejecución anterior")
+    parser.add_argument("--stop-after", type=int, default=DELTA_STOP_AFTER,
+                        help="Videos conocidos seguidos que detienen el rastreo incremental")
+    parser.add_argument("--refresh-recent", type=int, default=0,
+                        help="Videos conocidos más recientes que se vuelven a procesar en modo incremental")
+    args = parser.parse_args()
+    
     try:
         print("\n✨ Bienvenido al Extractor de Datos de TikTok ✨")
         print("Este script permite extraer datos de videos de perfiles de TikTok.")
@@ -730,7 +1542,8 @@ if __name__ == "__main__":
         while True:
             option = show_menu()
             if option == "1":
-                main()
+                main(workers=args.workers, backend=args.backend, pipeline=args.pipeline,
+                     delta=args.delta, stop_after=args.stop_after, refresh_recent=args.refresh_recent)
                 print("\nOperación completada. Puedes revisar el archivo CSV generado.")
             elif option == "2":
                 print("\n🙋‍♂️ ¡Gracias por usar el Extractor de Datos de TikTok!")
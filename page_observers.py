@@ -0,0 +1,408 @@
+"""Observadores que se inyectan en la página para no sondear el DOM desde Python.
+
+Cada observador se instala una sola vez por documento (la primera llamada lo
+inyecta) y deja su estado en una variable de window, de modo que Python lo
+consulta con una única lectura barata.
+"""
+import time
+
+# MutationObserver que marca window.__captchaWatch.hit cuando aparece un nodo de CAPTCHA/verificación
+CAPTCHA_WATCH_JS = """
+const config = arguments[0];
+if (!window.__captchaWatch) {
+    const watch = {hit: null};
+    const rules = config.text.map(([tag, text]) => [tag.toUpperCase(), text]);
+    const tags = new Set(rules.map(([tag]) => tag));
+    const selector = Array.from(tags).concat(['IFRAME']).join(',');
+
+    const ownText = (element) => {
+        let text = '';
+        for (const node of element.childNodes) {
+            if (node.nodeType === Node.TEXT_NODE) text += node.nodeValue;
+        }
+        return text;
+    };
+
+    const check = (element) => {
+        if (watch.hit || !element || element.nodeType !== Node.ELEMENT_NODE) return;
+        if (element.tagName === 'IFRAME') {
+            const src = element.src || '';
+            if (config.iframe_src.some(pattern => src.includes(pattern))) watch.hit = 'iframe: ' + src;
+            return;
+        }
+        if (tags.has(element.tagName)) {
+            const text = ownText(element);
+            const rule = rules.find(([tag, pattern]) => tag === element.tagName && text.includes(pattern));
+            if (rule) watch.hit = rule[1];
+        }
+    };
+
+    const scan = (root) => {
+        if (!root || root.nodeType !== Node.ELEMENT_NODE) return;
+        check(root);
+        for (const element of root.querySelectorAll(selector)) {
+            if (watch.hit) return;
+            check(element);
+        }
+    };
+
+    scan(document.documentElement);
+    new MutationObserver((mutations) => {
+        if (watch.hit) return;
+        for (const mutation of mutations) {
+            if (mutation.type === 'childList') {
+                for (const node of mutation.addedNodes) {
+                    if (node.nodeType === Node.TEXT_NODE) check(node.parentElement);
+                    else scan(node);
+                }
+            } else if (mutation.type === 'characterData') {
+                check(mutation.target.parentElement);
+            } else {
+                check(mutation.target);
+            }
+            if (watch.hit) break;
+        }
+    }).observe(document.documentElement, {
+        childList: true, subtree: true, characterData: true,
+        attributes: true, attributeFilter: ['src']
+    });
+    // Reexploración completa: el observador solo ve cambios, no un CAPTCHA que ya estaba
+    watch.scan = () => scan(document.documentElement);
+    window.__captchaWatch = watch;
+}
+return window.__captchaWatch.hit;
+"""
+
+def watch_for_captcha(driver, patterns):
+    """Instala el observador si hace falta y devuelve el indicador detectado (o None)."""
+    return driver.execute_script(CAPTCHA_WATCH_JS, patterns)
+
+def reset_captcha_watch(driver):
+    """Limpia la marca tras resolver el CAPTCHA y vuelve a revisar la página, de modo que uno que
+    siga presente se detecte de nuevo. Devuelve el indicador encontrado (o None)."""
+    return driver.execute_script("""
+        const watch = window.__captchaWatch;
+        if (!watch) return null;
+        watch.hit = null;
+        watch.scan();
+        return watch.hit;
+    """)
+
+# Observador que cierra los popups en cuanto aparecen y cuenta los cierres por selector
+POPUP_DISMISS_JS = """
+const selectors = arguments[0];
+if (!window.__popupWatch) {
+    const watch = {selectors: selectors, counts: {}, closed: []};
+
+    const visible = (element) => {
+        const rect = element.getBoundingClientRect();
+        const style = getComputedStyle(element);
+        return (rect.width > 0 || rect.height > 0) && style.visibility !== 'hidden' && style.display !== 'none';
+    };
+
+    watch.sweep = () => {
+        for (const selector of watch.selectors) {
+            let elements = [];
+            try {
+                elements = document.querySelectorAll(selector);
+            } catch (e) {
+                continue;
+            }
+            for (const element of elements) {
+                // Cada botón se pulsa una sola vez para no entrar en bucle si no se cierra
+                if (element.__scraperDismissed || !visible(element)) continue;
+                element.__scraperDismissed = true;
+                element.click();
+                watch.counts[selector] = (watch.counts[selector] || 0) + 1;
+                watch.closed.push(selector);
+            }
+        }
+    };
+
+    // Agrupa las mutaciones para barrer como mucho una vez cada 50 ms
+    let scheduled = false;
+    new MutationObserver(() => {
+        if (scheduled) return;
+        scheduled = true;
+        setTimeout(() => { scheduled = false; watch.sweep(); }, 50);
+    }).observe(document.documentElement, {childList: true, subtree: true});
+    window.__popupWatch = watch;
+}
+const watch = window.__popupWatch;
+watch.selectors = selectors;
+watch.sweep();
+const closed = watch.closed;
+watch.closed = [];
+return {counts: watch.counts, closed: closed};
+"""
+
+def dismiss_popups(driver, selectors):
+    """Instala el observador de popups si hace falta, barre la página y devuelve {'counts', 'closed'}."""
+    return driver.execute_script(POPUP_DISMISS_JS, selectors) or {'counts': {}, 'closed': []}
+
+def get_popup_counts(driver):
+    """Devuelve cuántos popups ha cerrado el observador en este documento, por selector."""
+    return driver.execute_script("return window.__popupWatch ? window.__popupWatch.counts : {};") or {}
+
+# Hover sintético sobre una ventana de miniaturas: dispara mouseover en todas a la vez y espera
+# con un MutationObserver (y un tiempo máximo por miniatura) a que cada una muestre su overlay
+BULK_HOVER_JS = """
+const args = Array.from(arguments);
+const done = args.pop();
+const timeoutMs = args.shift();
+const tiles = args;
+
+const leafTexts = (tile) => Array.from(tile.querySelectorAll('span, li'))
+    .filter(element => !element.querySelector('span, li'))
+    .map(element => (element.innerText || element.textContent || '').trim())
+    .filter(text => /\\d/.test(text));
+
+// Textos que aparecieron tras el hover: resta (como multiconjunto) los que ya estaban antes,
+// para que un número fijo de la miniatura (las vistas de un reel) no pase por likes
+const addedTexts = (tile, before) => {
+    const pending = new Map();
+    for (const text of before) pending.set(text, (pending.get(text) || 0) + 1);
+    return leafTexts(tile).filter(text => {
+        const count = pending.get(text) || 0;
+        if (count) pending.set(text, count - 1);
+        return !count;
+    });
+};
+
+const isVideo = (tile) => !!tile.querySelector('svg[aria-label="Video"], video, span[aria-label="Reel"], svg[aria-label="Clip"]')
+    || (tile.href || '').includes('/reel/');
+
+const waitForOverlay = (tile) => new Promise((resolve) => {
+    const before = leafTexts(tile);
+    let observer = null;
+    const finish = (timedOut) => {
+        if (observer) observer.disconnect();
+        clearTimeout(timer);
+        resolve({texts: addedTexts(tile, before), is_video: isVideo(tile), timed_out: timedOut});
+    };
+    const timer = setTimeout(() => finish(true), timeoutMs);
+    observer = new MutationObserver(() => {
+        if (addedTexts(tile, before).length) finish(false);
+    });
+    observer.observe(tile, {childList: true, subtree: true, characterData: true});
+    const target = tile.querySelector('img, div') || tile;
+    for (const type of ['mouseover', 'mouseenter', 'mousemove']) {
+        target.dispatchEvent(new MouseEvent(type, {bubbles: type !== 'mouseenter', cancelable: true, view: window}));
+    }
+});
+
+Promise.all(tiles.map(waitForOverlay)).then((results) => {
+    // Retirar el hover para que los overlays no se acumulen en la página
+    for (const tile of tiles) {
+        const target = tile.querySelector('img, div') || tile;
+        target.dispatchEvent(new MouseEvent('mouseout', {bubbles: true, relatedTarget: document.body, view: window}));
+        target.dispatchEvent(new MouseEvent('mouseleave', {bubbles: false, relatedTarget: document.body, view: window}));
+    }
+    done(results);
+});
+"""
+
+def bulk_hover(driver, elements, timeout):
+    """Hace hover sintético sobre varias miniaturas en un solo script y devuelve por cada una
+    {'texts' (solo los que aparecieron con el hover), 'is_video', 'timed_out'}, con `timeout` segundos como máximo."""
+    if not elements:
+        return []
+    return driver.execute_async_script(BULK_HOVER_JS, int(timeout * 1000), *elements) or []
+
+# Sube desde el enlace de un post hasta el contenedor más amplio que solo contiene ese post
+TILE_ROOT_JS = """
+const tileRoot = (element) => {
+    let tile = element;
+    for (let level = 0; level < 5 && tile.parentElement; level++) {
+        if (tile.parentElement.querySelectorAll('a[href*="/p/"], a[href*="/reel/"]').length > 1) break;
+        tile = tile.parentElement;
+    }
+    return tile;
+};
+"""
+
+# Lee en una sola llamada todas las métricas visibles de una miniatura, sin salir de su subárbol
+TILE_METRICS_JS = TILE_ROOT_JS + """
+const [element, overlaySelector] = arguments;
+const tile = tileRoot(element);
+
+const visible = (node) => {
+    const rect = node.getBoundingClientRect();
+    return rect.width > 0 || rect.height > 0;
+};
+const textOf = (node) => (node.innerText || '').trim();
+const ownText = (node) => Array.from(node.childNodes)
+    .filter(child => child.nodeType === Node.TEXT_NODE)
+    .map(child => child.nodeValue)
+    .join('');
+const query = (selector) => {
+    try {
+        return Array.from(tile.querySelectorAll(selector)).filter(visible);
+    } catch (e) {
+        return [];
+    }
+};
+
+return {
+    // Instantánea del overlay: textos y clases de sus spans y la marca de pseudo-elementos,
+    // calculada aquí para no enviar el innerHTML completo
+    overlays: query(overlaySelector).map(overlay => {
+        const spans = Array.from(overlay.querySelectorAll('span'));
+        const html = overlay.innerHTML;
+        return {
+            text: textOf(overlay),
+            spans: spans.map(textOf),
+            nodes: spans.map(span => ({text: textOf(span), classes: span.className || ''})),
+            pseudo: html.includes('::before') || html.includes('::after')
+        };
+    }),
+    spans: query('div.x1lliihq span, span.x1lliihq, span.html-span').map(textOf),
+    containers: query('div.x78zum5').map(textOf),
+    lines: query('*').filter(node => ownText(node).includes('\\n')).map(textOf)
+};
+"""
+
+def read_tile_metrics(driver, element, overlay_selector):
+    """Devuelve en un solo viaje los textos de métricas de la miniatura de `element`:
+    {'overlays': [{'text', 'spans', 'nodes', 'pseudo'}], 'spans', 'containers', 'lines'}."""
+    return driver.execute_script(TILE_METRICS_JS, element, overlay_selector) or {
+        'overlays': [], 'spans': [], 'containers': [], 'lines': []
+    }
+
+# Cuenta las peticiones fetch/XHR en curso. Se instala una sola vez por documento y queda activo
+# entre esperas, así una petición lanzada justo tras el scroll ya está contada cuando empieza la espera
+NETWORK_TRACKER_JS = """
+const network = window.__scraperNetwork || (() => {
+    const state = {pending: 0, last: performance.now()};
+    const begin = () => { state.pending++; state.last = performance.now(); };
+    const end = () => { state.pending = Math.max(0, state.pending - 1); state.last = performance.now(); };
+    if (window.fetch) {
+        const originalFetch = window.fetch;
+        window.fetch = function() {
+            begin();
+            return originalFetch.apply(this, arguments).finally(end);
+        };
+    }
+    const originalSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function() {
+        begin();
+        this.addEventListener('loadend', end, {once: true});
+        return originalSend.apply(this, arguments);
+    };
+    window.__scraperNetwork = state;
+    return state;
+})();
+"""
+
+def track_network(driver):
+    """Empieza a contar las peticiones en curso de la página (llamar tras cargarla y antes del scroll)."""
+    try:
+        driver.execute_script(NETWORK_TRACKER_JS)
+    except Exception:
+        pass
+
+# Espera a que el scroll cargue contenido: resuelve en cuanto crece el número de miniaturas o la altura,
+# o cuando la red lleva `idleMs` sin terminar recursos; nunca antes de `floorMs` ni después de `ceilingMs`
+SCROLL_WAIT_JS = NETWORK_TRACKER_JS + """
+const [selector, floorMs, ceilingMs, idleMs, done] = arguments;
+const start = performance.now();
+
+const countTiles = () => {
+    try {
+        if (selector.startsWith('/') || selector.startsWith('(')) {
+            return document.evaluate('count(' + selector + ')', document, null, XPathResult.NUMBER_TYPE, null).numberValue;
+        }
+        return document.querySelectorAll(selector).length;
+    } catch (e) {
+        return 0;
+    }
+};
+const initialTiles = countTiles();
+const initialHeight = document.body.scrollHeight;
+
+// Marca de la última respuesta de red terminada (también las que no pasan por fetch/XHR)
+let lastNetwork = start;
+let resourceObserver = null;
+try {
+    resourceObserver = new PerformanceObserver(() => { lastNetwork = performance.now(); });
+    resourceObserver.observe({type: 'resource', buffered: false});
+} catch (e) {}
+
+let finished = false;
+let reason = null;
+const finish = (why) => {
+    if (finished) return;
+    finished = true;
+    clearInterval(poll);
+    clearTimeout(ceiling);
+    domObserver.disconnect();
+    if (resourceObserver) resourceObserver.disconnect();
+    done({
+        reason: why,
+        elapsed: (performance.now() - start) / 1000,
+        tiles: countTiles(),
+        height: document.body.scrollHeight
+    });
+};
+
+const check = () => {
+    if (!reason) {
+        if (countTiles() > initialTiles) reason = 'tiles';
+        else if (document.body.scrollHeight > initialHeight) reason = 'height';
+        else if (network.pending === 0 && performance.now() - Math.max(lastNetwork, network.last) >= idleMs) reason = 'idle';
+    }
+    if (reason && performance.now() - start >= floorMs) finish(reason);
+};
+
+const domObserver = new MutationObserver(check);
+domObserver.observe(document.body, {childList: true, subtree: true});
+const poll = setInterval(check, 100);
+const ceiling = setTimeout(() => finish(reason || 'timeout'), ceilingMs);
+"""
+
+# Vacía las miniaturas ya procesadas: quita imágenes y vídeos, fija su tamaño para no alterar la altura
+# del scroll (el cargador infinito sigue disparándose) y las marca para excluirlas de los selectores
+PRUNE_TILES_JS = TILE_ROOT_JS + """
+const BLANK = 'data:image/gif;base64,R0lGODlhAQABAAAAACH5BAEKAAEALAAAAAABAAEAAAICTAEAOw==';
+let pruned = 0;
+for (const link of Array.from(arguments)) {
+    const tile = tileRoot(link);
+    if (tile.dataset.scraperPruned) continue;
+    const rect = tile.getBoundingClientRect();
+    tile.style.width = rect.width + 'px';
+    tile.style.height = rect.height + 'px';
+    tile.style.containIntrinsicSize = rect.width + 'px ' + rect.height + 'px';
+    tile.style.contentVisibility = 'hidden';
+    for (const image of tile.querySelectorAll('img')) {
+        image.removeAttribute('srcset');
+        image.removeAttribute('sizes');
+        image.src = BLANK;
+    }
+    for (const video of tile.querySelectorAll('video')) {
+        video.removeAttribute('src');
+        video.load();
+    }
+    tile.dataset.scraperPruned = '1';
+    pruned++;
+}
+return pruned;
+"""
+
+def prune_tiles(driver, elements):
+    """Vacía las miniaturas de los enlaces dados y devuelve cuántas se han podado."""
+    if not elements:
+        return 0
+    return driver.execute_script(PRUNE_TILES_JS, *elements) or 0
+
+def wait_for_scroll_growth(driver, selector, floor, ceiling, idle=0.8):
+    """Espera tras un scroll hasta que aparezcan miniaturas nuevas, crezca la altura o la red quede
+    inactiva `idle` segundos sin peticiones en curso, respetando un mínimo `floor` y un máximo `ceiling`
+    (segundos). Devuelve {'reason', 'elapsed', 'tiles', 'height'}."""
+    try:
+        return driver.execute_async_script(
+            SCROLL_WAIT_JS, selector, int(floor * 1000), int(ceiling * 1000), int(idle * 1000)
+        )
+    except Exception:
+        # Sin script asíncrono disponible: la espera fija de siempre
+        time.sleep(ceiling)
+        return None
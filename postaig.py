@@ -5,39 +5,442 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
+from selenium.common.exceptions import TimeoutException, ElementClickInterceptedException
 from webdriver_manager.chrome import ChromeDriverManager
+from cdp_engine import create_cdp_driver
+from selector_registry import SelectorRegistry
+from crawl_state import CrawlState, DELTA_STOP_AFTER
+from page_observers import dismiss_popups, bulk_hover, read_tile_metrics, wait_for_scroll_growth, prune_tiles, track_network
+
+try:
+    from cryptography.fernet import Fernet, InvalidToken
+except ImportError:
+    Fernet = None
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import csv
+import json
 import time
+import base64
+import hashlib
 import queue
+import threading
+import subprocess
 import os
 import re
 
 # Cola thread-safe para almacenar resultados
 results_queue = queue.Queue()
 
+# Estadísticas de aciertos de las listas de selectores alternativos (persisten entre ejecuciones)
+SELECTORS = SelectorRegistry("instagram")
+
 # Límite máximo de publicaciones a procesar
 MAX_POSTS = 600
 
+# Botones de cierre que el observador inyectado pulsa en cuanto aparecen
+POPUP_SELECTORS = [
+    "button[data-testid='cookie-policy-banner-close']",
+    "div[role='dialog'] button[type='button']",
+    "button[aria-label='Close']",
+    "button._a9--._a9_1",
+    "button._acan._acap._acas"
+]
+
+# Overlay con las métricas que aparece sobre la miniatura al hacer hover
+HOVER_OVERLAY_SELECTOR = "div.x1ey2m1c.x78zum5"
+
+# Hover por lotes: miniaturas por script y espera máxima del overlay de cada una (segundos)
+HOVER_BATCH = 12
+HOVER_TIMEOUT = 2
+
+# Predicado XPath que excluye las miniaturas ya podadas (modo prune_tiles)
+PRUNED_TILE_FILTER = "[not(ancestor-or-self::*[@data-scraper-pruned])]"
+
+# Espera tras cada scroll: mínimo de ritmo, máximo y silencio de red que la da por terminada (segundos)
+SCROLL_WAIT_FLOOR = 0.5
+SCROLL_WAIT_CEILING = 3
+SCROLL_NETWORK_IDLE = 0.8
+SCROLL_RETRY_BUDGET = 3  # Segundos de reintentos sin crecimiento antes de dar el perfil por terminado
+
+# Configuración por defecto del pool de navegadores
+POOL_MAX_IDLE = 300  # Segundos que una sesión puede estar inactiva antes de cerrarse
+
+# Patrones de URL bloqueados en modo ligero (imágenes, media, fuentes y trackers)
+LEAN_BLOCKED_URLS = [
+    "*.jpg*", "*.jpeg*", "*.png*", "*.gif*", "*.webp*", "*.heic*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m4a*", "*.mp3*",
+    "*.woff*", "*.ttf*", "*.otf*",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*connect.facebook.net*", "*facebook.com/tr*"
+]
+
+# Patrones de LEAN_BLOCKED_URLS que no deben bloquearse aunque el modo ligero esté activo
+LEAN_ALLOWLIST = []
+
+# Respuestas de red que traen los posts del perfil (modo de captura de red)
+FEED_URL_PATTERNS = [
+    "/graphql/query",
+    "/api/graphql",
+    "/api/v1/feed/user/",
+    "/api/v1/users/web_profile_info/"
+]
+
+# Carpeta donde se guardan las sesiones cifradas (cookies + localStorage)
+SESSION_DIR = os.path.join(os.getcwd(), "sesiones")
+SESSION_SALT_SIZE = 16
+
+def derive_session_key(password, salt):
+    """Deriva la clave Fernet del archivo de sesión a partir de la contraseña."""
+    key = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), salt, 200000)
+    return base64.urlsafe_b64encode(key)
+
+# Caché local de chromedriver, indexada por la versión de Chrome instalada
+DRIVER_CACHE_FILE = os.path.join(os.getcwd(), "chromedriver_cache.json")
+
+def get_chrome_version():
+    """Obtiene la versión de Chrome instalada sin usar la red."""
+    commands = [
+        ["google-chrome", "--version"],
+        ["google-chrome-stable", "--version"],
+        ["chromium", "--version"],
+        ["chromium-browser", "--version"],
+        ["/Applications/Google Chrome.app/Contents/MacOS/Google Chrome", "--version"],
+        ["reg", "query", r"HKEY_CURRENT_USER\Software\Google\Chrome\BLBeacon", "/v", "version"],
+        ["reg", "query", r"HKEY_LOCAL_MACHINE\Software\Google\Chrome\BLBeacon", "/v", "version"]
+    ]
+    
+    for command in commands:
+        try:
+            output = subprocess.run(command, capture_output=True, text=True, timeout=5).stdout
+            match = re.search(r'\d+\.\d+\.\d+\.\d+', output)
+            if match:
+                return match.group(0)
+        except Exception:
+            continue
+    return None
+
+def load_driver_cache():
+    try:
+        with open(DRIVER_CACHE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_driver_cache(cache):
+    try:
+        with open(DRIVER_CACHE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, indent=2)
+    except OSError as e:
+        print(f"No se pudo guardar la caché de chromedriver: {e}")
+
+def resolve_chromedriver():
+    """Devuelve la ruta de chromedriver usando la caché local antes que la red."""
+    cache = load_driver_cache()
+    chrome_version = get_chrome_version()
+    
+    # Camino rápido: la caché ya tiene un driver para esta versión de Chrome
+    if chrome_version:
+        cached_path = cache.get(chrome_version)
+        if cached_path and os.path.exists(cached_path):
+            return cached_path
+    else:
+        # Versión desconocida (Chrome fuera del PATH): cualquier driver guardado evita ir a la red,
+        # empezando por el que se resolvió la última vez sin versión
+        for cached_path in [cache.get("desconocida")] + list(reversed(cache.values())):
+            if cached_path and os.path.exists(cached_path):
+                return cached_path
+    
+    try:
+        driver_path = ChromeDriverManager().install()
+        cache[chrome_version or "desconocida"] = driver_path
+        save_driver_cache(cache)
+        return driver_path
+    except Exception as e:
+        print(f"No se pudo resolver chromedriver en línea: {e}")
+    
+    # Sin red: usar un driver de la misma versión mayor o, en su defecto, el último guardado
+    candidates = [(version, path) for version, path in cache.items() if os.path.exists(path)]
+    if chrome_version:
+        major = chrome_version.split('.')[0]
+        same_major = [c for c in candidates if c[0].split('.')[0] == major]
+        if same_major:
+            candidates = same_major
+    if candidates:
+        version, path = candidates[-1]
+        print(f"Usando chromedriver en caché (Chrome {version})")
+        return path
+    raise RuntimeError("No hay chromedriver disponible en caché ni en línea")
+
+def parse_count(text):
+    """Convierte '1,234', '12.3K', '1.2M' o '12,3 mil' en un entero (None si no hay número)."""
+    # El sufijo no puede ir seguido de otra letra: '5 min' son 5, no 5 millones
+    match = re.search(r'(\d[\d.,]*)\s*(?:(millones|mill|mil|k|m)(?![^\W\d_]))?', text.strip().lower())
+    if not match:
+        return None
+    number, suffix = match.groups()
+    multiplier = {'k': 1000, 'mil': 1000, 'm': 1000000, 'mill': 1000000, 'millones': 1000000}.get(suffix, 1)
+    if multiplier > 1:
+        return int(float(number.replace(',', '.')) * multiplier)
+    return int(re.sub(r'[.,]', '', number))
+
+def shortcode_from_link(link):
+    """Extrae el shortcode de una URL de post o reel."""
+    match = re.search(r'/(?:p|reel|tv)/([^/?#]+)', link or "")
+    return match.group(1) if match else None
+
+def parse_feed_media(node):
+    """Convierte un nodo de media (GraphQL o API v1) en un registro de post, o None si no lo es."""
+    shortcode = node.get('shortcode') or node.get('code')
+    if not isinstance(shortcode, str):
+        return None
+    
+    if 'edge_liked_by' in node or 'edge_media_preview_like' in node or 'taken_at_timestamp' in node:
+        # Formato GraphQL clásico
+        likes = (node.get('edge_liked_by') or node.get('edge_media_preview_like') or {}).get('count')
+        comments = (node.get('edge_media_to_comment') or node.get('edge_media_preview_comment') or {}).get('count')
+        timestamp = node.get('taken_at_timestamp')
+        caption_edges = (node.get('edge_media_to_caption') or {}).get('edges') or []
+        caption = caption_edges[0].get('node', {}).get('text', "") if caption_edges else ""
+        is_video = bool(node.get('is_video'))
+        views = node.get('video_view_count')
+    elif 'like_count' in node or 'taken_at' in node:
+        # Formato de la API v1 (también el de las consultas GraphQL xdt_api__v1__feed)
+        likes = node.get('like_count')
+        comments = node.get('comment_count')
+        timestamp = node.get('taken_at')
+        caption = (node.get('caption') or {}).get('text', "")
+        is_video = node.get('media_type') == 2 or node.get('product_type') == 'clips'
+        views = node.get('play_count') or node.get('view_count')
+    else:
+        return None
+    
+    return {
+        'shortcode': shortcode,
+        'is_video': is_video,
+        'type': "Video" if is_video else "Imagen",
+        'likes': likes or 0,
+        'comments': comments or 0,
+        'date': time.strftime('%Y-%m-%d %H:%M:%S', time.gmtime(timestamp)) if timestamp else "N/A",
+        'caption': caption,
+        'views': views if is_video and views is not None else "N/A"
+    }
+
+def find_feed_media(data, found=None):
+    """Recorre una respuesta JSON y devuelve {shortcode: registro} de todos los posts que contiene."""
+    if found is None:
+        found = {}
+    if isinstance(data, dict):
+        record = parse_feed_media(data)
+        if record:
+            found[record['shortcode']] = record
+        for value in data.values():
+            if isinstance(value, (dict, list)):
+                find_feed_media(value, found)
+    elif isinstance(data, list):
+        for value in data:
+            if isinstance(value, (dict, list)):
+                find_feed_media(value, found)
+    return found
+
 class InstagramScraper:
-    def __init__(self):
+    def __init__(self, lean=False, backend="selenium", capture_network=False, hover_mode="single", hover_batch=HOVER_BATCH, hover_timeout=HOVER_TIMEOUT, prune_tiles=False):
         self.driver = None
         self.logged_in = False
+        self.startup_time = None
+        self.lean = lean
+        self.backend = backend
+        self.capture_network = capture_network
+        self.hover_mode = hover_mode
+        self.hover_batch = hover_batch
+        self.hover_timeout = hover_timeout
+        self.prune_tiles = prune_tiles
+        self.captured_posts = {}
+        self._feed_requests = {}
+        self._finished_feed = []
+        self._transferred_bytes = 0
     
     def setup_driver(self):
+        start = time.perf_counter()
         options = Options()
         options.add_argument("--disable-blink-features=AutomationControlled")
         options.add_experimental_option("excludeSwitches", ["enable-automation"])
         options.add_experimental_option('useAutomationExtension', False)
-        service = Service(ChromeDriverManager().install())
-        self.driver = webdriver.Chrome(service=service, options=options)
+        if self.lean or self.capture_network:
+            # Registrar la red para medir los bytes transferidos y capturar las respuestas del feed
+            options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+        if self.backend == "cdp":
+            # Motor CDP asíncrono: no necesita chromedriver
+            self.driver = create_cdp_driver(options.arguments)
+        else:
+            service = Service(resolve_chromedriver())
+            self.driver = webdriver.Chrome(service=service, options=options)
         self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        if self.lean:
+            self.enable_lean_mode()
+        if self.capture_network:
+            self.enable_network_capture()
+        self.startup_time = time.perf_counter() - start
+        return self.driver
     
+    def enable_lean_mode(self, allowlist=None):
+        """Bloquea imágenes, media, fuentes y trackers mediante CDP."""
+        allowlist = LEAN_ALLOWLIST if allowlist is None else allowlist
+        blocked = [pattern for pattern in LEAN_BLOCKED_URLS if pattern not in allowlist]
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+            self.driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked})
+            print(f"Modo ligero activado ({len(blocked)} patrones bloqueados)")
+        except Exception as e:
+            print(f"No se pudo activar el modo ligero: {e}")
+        return blocked
+
+    def enable_network_capture(self):
+        """Activa el dominio Network con búfer suficiente para leer después los cuerpos de las respuestas."""
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {
+                "maxTotalBufferSize": 100 * 1024 * 1024,
+                "maxResourceBufferSize": 10 * 1024 * 1024
+            })
+        except Exception as e:
+            print(f"No se pudo activar la captura de red: {e}")
+            self.capture_network = False
+
+    def drain_network_log(self):
+        """Lee el log de red una sola vez (leerlo lo vacía): acumula los bytes y anota las respuestas del feed."""
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception:
+            return False
+        
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+                params = message.get("params", {})
+                if message["method"] == "Network.responseReceived" and self.capture_network:
+                    url = params["response"]["url"]
+                    if any(pattern in url for pattern in FEED_URL_PATTERNS):
+                        self._feed_requests[params["requestId"]] = url
+                elif message["method"] == "Network.loadingFinished":
+                    self._transferred_bytes += params.get("encodedDataLength", 0)
+                    if params.get("requestId") in self._feed_requests:
+                        self._finished_feed.append(params["requestId"])
+            except (KeyError, ValueError):
+                continue
+        return True
+
+    def get_transferred_bytes(self):
+        """Suma los bytes recibidos desde la última lectura del log de red (None si no está disponible)."""
+        if not self.drain_network_log():
+            return None
+        total = self._transferred_bytes
+        self._transferred_bytes = 0
+        return total
+
+    def collect_feed_posts(self):
+        """Lee los cuerpos de las respuestas del feed terminadas y añade sus posts a captured_posts."""
+        if not self.capture_network:
+            return self.captured_posts
+        self.drain_network_log()
+        
+        finished, self._finished_feed = self._finished_feed, []
+        for request_id in finished:
+            url = self._feed_requests.pop(request_id, "")
+            try:
+                response = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+                body = response.get("body", "")
+                if response.get("base64Encoded"):
+                    body = base64.b64decode(body).decode('utf-8', errors='replace')
+                found = find_feed_media(json.loads(body))
+            except Exception:
+                # El cuerpo ya no está en el búfer o no es JSON
+                continue
+            if found:
+                print(f"Capturados {len(found)} posts de {url.split('?')[0]}")
+                self.captured_posts.update(found)
+        return self.captured_posts
+
+    def session_file(self, username):
+        return os.path.join(SESSION_DIR, f"{username}.session")
+
+    def save_session(self, username, password):
+        """Guarda cifradas las cookies y el localStorage de la sesión actual."""
+        if Fernet is None:
+            print("Instala 'cryptography' para guardar la sesión entre ejecuciones")
+            return False
+        
+        try:
+            snapshot = {
+                'cookies': self.driver.get_cookies(),
+                'local_storage': self.driver.execute_script("return Object.assign({}, window.localStorage);"),
+                'saved_at': time.time()
+            }
+            salt = os.urandom(SESSION_SALT_SIZE)
+            token = Fernet(derive_session_key(password, salt)).encrypt(json.dumps(snapshot).encode('utf-8'))
+            
+            os.makedirs(SESSION_DIR, exist_ok=True)
+            with open(self.session_file(username), 'wb') as f:
+                f.write(salt + token)
+            print("Sesión guardada para próximas ejecuciones")
+            return True
+        except Exception as e:
+            print(f"No se pudo guardar la sesión: {e}")
+            return False
+
+    def restore_session(self, username, password):
+        """Restaura la sesión guardada y la valida. Devuelve False si hace falta el login normal."""
+        path = self.session_file(username)
+        if Fernet is None or not os.path.exists(path):
+            return False
+        
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            salt, token = data[:SESSION_SALT_SIZE], data[SESSION_SALT_SIZE:]
+            snapshot = json.loads(Fernet(derive_session_key(password, salt)).decrypt(token))
+        except (InvalidToken, ValueError, OSError) as e:
+            print(f"No se pudo leer la sesión guardada: {e}")
+            return False
+        
+        try:
+            # Hay que estar en el dominio para poder añadir cookies y localStorage
+            self.driver.get("https://www.instagram.com/robots.txt")
+            for cookie in snapshot['cookies']:
+                try:
+                    self.driver.add_cookie(cookie)
+                except Exception:
+                    continue
+            self.driver.execute_script(
+                "const data = arguments[0]; for (const key in data) { localStorage.setItem(key, data[key]); }",
+                snapshot['local_storage']
+            )
+            return self.validate_session()
+        except Exception as e:
+            print(f"Error al restaurar la sesión: {e}")
+            return False
+
+    def validate_session(self):
+        """Comprobación rápida de que la sesión sigue activa."""
+        if not self.driver.get_cookie("sessionid"):
+            return False
+        
+        self.driver.get("https://www.instagram.com/")
+        try:
+            WebDriverWait(self.driver, 8).until(
+                lambda d: d.find_elements(By.XPATH, "//section//main") or d.find_elements(By.NAME, "username")
+            )
+        except TimeoutException:
+            return False
+        return not self.driver.find_elements(By.NAME, "username")
+
     def login_to_instagram(self, username, password):
         """Función para iniciar sesión en Instagram"""
         if self.logged_in:
             return True
+        
+        if self.restore_session(username, password):
+            print("Sesión restaurada, se omite el formulario de login")
+            self.logged_in = True
+            return True
             
         try:
             print("Intentando iniciar sesión en Instagram...")
@@ -65,6 +468,7 @@ class InstagramScraper:
             
             print("Inicio de sesión exitoso")
             self.logged_in = True
+            self.save_session(username, password)
             return True
             
         except Exception as e:
@@ -73,92 +477,117 @@ class InstagramScraper:
 
     def close_popups(self):
         """Cierra cualquier popup que pueda aparecer en Instagram."""
-        popup_selectors = [
-            "button[data-testid='cookie-policy-banner-close']",
-            "div[role='dialog'] button[type='button']",
-            "button[aria-label='Close']",
-            "button._a9--._a9_1",
-            "button._acan._acap._acas"
-        ]
+        # Una sola llamada: instala el observador (si falta) que cierra también los popups futuros
+        try:
+            result = dismiss_popups(self.driver, POPUP_SELECTORS)
+        except Exception:
+            return {}
         
-        for selector in popup_selectors:
-            try:
-                buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                for button in buttons:
-                    if button.is_displayed():
-                        try:
-                            button.click()
-                            time.sleep(1)
-                        except:
-                            self.driver.execute_script("arguments[0].click();", button)
-                            time.sleep(1)
-            except:
-                pass
+        for selector in result['closed']:
+            print(f"Popup cerrado con selector: {selector}")
+        return result['counts']
 
     def hover_over_post(self, element):
         """Emula el hover sobre un post para mostrar los likes y comentarios."""
         try:
-            actions = ActionChains(self.driver)
-            actions.move_to_element(element).pause(1).perform()
+            if hasattr(element, "hover"):
+                # Elemento del motor CDP: hover con eventos de ratón reales
+                element.hover()
+                time.sleep(1)
+            else:
+                actions = ActionChains(self.driver)
+                actions.move_to_element(element).pause(1).perform()
             time.sleep(1.5)  # Esperar a que aparezcan los datos
             
+            # Todas las búsquedas, limitadas a la miniatura y en un solo viaje al navegador
+            metrics = read_tile_metrics(self.driver, element, HOVER_OVERLAY_SELECTOR)
+            
             # Intentar capturar el overlay específico
-            try:
-                overlay = self.driver.find_element(By.XPATH, "//div[contains(@class, 'x1ey2m1c') and contains(@class, 'x78zum5')]")
-                if overlay.is_displayed():
-                    likes = self.extract_count_from_element(overlay, "like")
-                    comments = self.get_comments_count_from_span()  # Nuevo método específico
-                    return likes, comments
-            except NoSuchElementException:
-                pass
+            if metrics['overlays']:
+                likes = self.extract_count_from_element(metrics['overlays'][0], "like")
+                comments = self.get_comments_count_from_span(metrics)
+                return likes, comments
                 
             # Método alternativo si no se encuentra el overlay específico
-            likes = self.get_hover_likes()
-            comments = self.get_comments_count_from_span()  # Usamos el nuevo método aquí también
+            likes = self.get_hover_likes(metrics)
+            comments = self.get_comments_count_from_span(metrics)
             
             return likes, comments
         except Exception as e:
             print(f"Error al hacer hover: {e}")
             return 0, 0
 
-    def get_comments_count_from_span(self):
-        """Obtiene los comentarios del span específico que proporcionaste"""
+    def bulk_hover_posts(self, elements):
+        """Hover sintético sobre varios posts en un solo script. Devuelve por post (likes, comentarios, es_video),
+        o None en los que el overlay no apareció a tiempo."""
         try:
-            # Buscar el span con las clases específicas que mencionaste
-            comment_spans = self.driver.find_elements(By.XPATH, 
-                "//div[contains(@class, 'x1lliihq')]/span | " +
-                "//span[contains(@class, 'x1lliihq')] | " +
-                "//div[contains(@class, 'x1lliihq')]//span")
-            
-            for span in comment_spans:
-                if span.text and span.text.isdigit():
-                    return int(span.text)
-            
-            return 0
+            results = bulk_hover(self.driver, elements, self.hover_timeout)
+        except Exception as e:
+            print(f"Error en el hover por lotes: {e}")
+            return [None] * len(elements)
+        
+        metrics = []
+        for result in results:
+            numbers = [parse_count(text) for text in result['texts']]
+            numbers = [number for number in numbers if number is not None]
+            if result['timed_out'] and not numbers:
+                metrics.append(None)
+                continue
+            # El overlay muestra likes y comentarios en ese orden; con un solo número los likes están ocultos
+            if len(numbers) >= 2:
+                likes, comments = numbers[0], numbers[1]
+            else:
+                likes, comments = 0, numbers[0] if numbers else 0
+            metrics.append((likes, comments, result['is_video']))
+        return metrics
+
+    def hover_posts_in_batches(self, pending):
+        """Completa los posts pendientes [(post, info)] por ventanas de hover_batch miniaturas."""
+        for start in range(0, len(pending), self.hover_batch):
+            window = pending[start:start + self.hover_batch]
+            metrics = self.bulk_hover_posts([post['element'] for post, _ in window])
+            for (post, info), result in zip(window, metrics):
+                if result is None:
+                    # Sin overlay a tiempo: hover clásico solo para esta miniatura
+                    likes, comments = self.hover_over_post(post['element'])
+                    is_video_post = self.is_video(post['element'])
+                else:
+                    likes, comments, is_video_post = result
+                info.update({
+                    'is_video': is_video_post,
+                    'type': "Video" if is_video_post else "Imagen",
+                    'likes': likes,
+                    'comments': comments
+                })
+
+    def get_comments_count_from_span(self, metrics):
+        """Obtiene los comentarios de los spans de la miniatura (el segundo número del overlay)"""
+        try:
+            numbers = [int(text) for text in metrics['spans'] if text.isdigit()]
+            return numbers[1] if len(numbers) > 1 else 0
         except Exception as e:
             print(f"Error al obtener comentarios del span: {e}")
             return 0
 
-    def extract_count_from_element(self, element, type_str):
+    def extract_count_from_element(self, snapshot, type_str):
+        """Extrae un conteo de la instantánea del overlay (textos, clases y marca de pseudo-elementos)."""
         try:
-        # Buscar todos los spans en el elemento
-            spans = element.find_elements(By.TAG_NAME, "span")
-            for span in spans:
-            # Obtener el texto del span
-                text = span.text.strip()
+        # Recorrer todos los spans de la instantánea
+            for span in snapshot['nodes']:
+            # Texto del span
+                text = span['text'].strip()
             
             # Si el tipo buscado está en el texto o si hay un patrón numérico específico
-                if type_str in text.lower() or (re.match(r'^\d+$', text) and ('::before' in element.get_attribute('innerHTML') or '::after' in element.get_attribute('innerHTML'))):
+                if type_str in text.lower() or (re.match(r'^\d+$', text) and snapshot['pseudo']):
                 # Extraer números, eliminando comas
                     numbers = re.findall(r'\d+', text.replace(",", ""))
                     if numbers:
                         return int(numbers[0])
         
         # Buscar específicamente spans con clases que pueden contener contadores
-            counter_spans = element.find_elements(By.CSS_SELECTOR, "span.html-span")
-            for span in counter_spans:
-                text = span.text.strip()
-                if text and text.isdigit():
+            for span in snapshot['nodes']:
+                text = span['text'].strip()
+                if 'html-span' in span['classes'].split() and text and text.isdigit():
                     return int(text)
                 
             return 0
@@ -166,17 +595,12 @@ class InstagramScraper:
             print(f"Error extrayendo conteo: {e}")
             return 0
 
-    def get_hover_likes(self):
+    def get_hover_likes(self, metrics):
         try:
-        # Usar los mismos selectores que ya tenías
-            like_spans = self.driver.find_elements(By.XPATH, 
-            "//div[contains(@class, 'x1lliihq')]/span | " +
-            "//span[contains(@class, 'x1lliihq')] | " +
-            "//div[contains(@class, 'x1lliihq')]//span")
-        
-            for span in like_spans:
-                if span.text and span.text.isdigit():
-                     return int(span.text)
+        # Primer número de los spans de la miniatura
+            for text in metrics['spans']:
+                if text.isdigit():
+                     return int(text)
         
             return 0
         except Exception as e:
@@ -217,7 +641,13 @@ class InstagramScraper:
             return False
 
     def scroll_to_load_posts(self, max_posts=MAX_POSTS):
-        SCROLL_PAUSE_TIME = 3
+        """Devuelve la lista completa de posts cuando termina el scroll."""
+        return list(self.iter_posts(max_posts))
+
+    def iter_posts(self, max_posts=MAX_POSTS, state=None):
+        """Genera cada registro de post en cuanto se descubre, mientras continúa el scroll.
+        Con `state` (CrawlState) solo entrega los posts nuevos o a refrescar y para en los ya conocidos."""
+        track_network(self.driver)
         last_height = self.driver.execute_script("return document.body.scrollHeight")
         posts_info = []
         seen_links = set()
@@ -231,25 +661,65 @@ class InstagramScraper:
         while len(posts_info) < max_posts:
             self.close_popups()
             
+            # Probar primero el selector que más acierta y parar en el primero que encuentre posts
             current_posts = []
-            for selector in post_selectors:
+            for selector in SELECTORS.ordered('instagram.grid.post', post_selectors):
+                found = False
+                # Con la poda activa, las miniaturas ya procesadas no vuelven a recorrerse
+                query = selector + PRUNED_TILE_FILTER if self.prune_tiles else selector
                 try:
-                    elements = self.driver.find_elements(By.XPATH, selector)
+                    elements = self.driver.find_elements(By.XPATH, query)
                     for el in elements:
                         link = el.get_attribute('href')
-                        if link and link not in seen_links and ("/p/" in link or "/reel/" in link):
-                            seen_links.add(link)
-                            current_posts.append({
-                                'link': link,
-                                'element': el
-                            })
+                        if link and ("/p/" in link or "/reel/" in link):
+                            found = True
+                            if link not in seen_links:
+                                seen_links.add(link)
+                                current_posts.append({
+                                    'link': link,
+                                    'element': el
+                                })
+                    # Sin resultados tras el filtro pero con miniaturas ya podadas: el selector sigue
+                    # funcionando, solo no hay posts nuevos montados; no se cuenta como fallo
+                    post_links = selector + "[contains(@href, '/p/') or contains(@href, '/reel/')]"
+                    if not found and self.prune_tiles and self.driver.find_elements(By.XPATH, post_links):
+                        break
                 except Exception as e:
                     print(f"Error con selector {selector}: {e}")
+                SELECTORS.record('instagram.grid.post', selector, found)
+                if found:
+                    break
+            
+            # Posts que ya llegaron en las respuestas JSON del feed (modo de captura de red)
+            captured = self.collect_feed_posts()
             
+            pending = []
+            reached_known = False
             for post in current_posts:
                 if len(posts_info) >= max_posts:
                     break
                 
+                if state and not state.check(shortcode_from_link(post['link']) or post['link']):
+                    # Rastreo incremental: saltar los ya vistos y parar tras varios conocidos seguidos
+                    if state.should_stop():
+                        reached_known = True
+                        break
+                    continue
+                
+                record = captured.get(shortcode_from_link(post['link']))
+                if record:
+                    # Datos completos desde la red: no hace falta el hover
+                    posts_info.append(dict(record, link=post['link']))
+                    yield posts_info[-1]
+                    continue
+                
+                if self.hover_mode == "bulk":
+                    # Se reserva su posición y se completa con el hover por lotes
+                    info = {'link': post['link']}
+                    posts_info.append(info)
+                    pending.append((post, info))
+                    continue
+                
                 try:
                     # Hacer hover sobre el post para obtener likes y comentarios
                     likes, comments = self.hover_over_post(post['element'])
@@ -264,29 +734,54 @@ class InstagramScraper:
                         'likes': likes,
                         'comments': comments
                     })
+                    yield posts_info[-1]
                 except Exception as e:
                     print(f"Error procesando post: {e}")
             
+            if pending:
+                self.hover_posts_in_batches(pending)
+                for _, info in pending:
+                    yield info
+            
+            if self.prune_tiles and current_posts:
+                # Vaciar las miniaturas ya procesadas para que la memoria y el coste por vuelta no crezcan
+                try:
+                    prune_tiles(self.driver, [post['element'] for post in current_posts])
+                except Exception as e:
+                    print(f"Error al podar miniaturas: {e}")
+            
             print(f"Posts encontrados: {len(posts_info)}/{max_posts}")
             
             if len(posts_info) >= max_posts:
                 break
             
+            if reached_known:
+                print(f"Se alcanzaron {state.consecutive_known} posts ya conocidos seguidos. Fin del rastreo incremental.")
+                break
+            
+            # Esperar solo hasta que aparezcan posts nuevos o la red quede inactiva
+            tile_selector = " | ".join(post_selectors)
             self.driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-            time.sleep(SCROLL_PAUSE_TIME)
+            self.wait_for_posts(tile_selector, SCROLL_WAIT_CEILING)
             
             new_height = self.driver.execute_script("return document.body.scrollHeight")
             if new_height == last_height:
-                for _ in range(3):
+                # Reintentar durante el mismo margen que antes; una red inactiva no es un intento fallido
+                retry_deadline = time.time() + SCROLL_RETRY_BUDGET
+                while time.time() < retry_deadline:
                     self.driver.execute_script("window.scrollBy(0, 500);")
-                    time.sleep(1)
+                    if self.wait_for_posts(tile_selector, 1) in ('tiles', 'height'):
+                        break
                 new_height = self.driver.execute_script("return document.body.scrollHeight")
                 if new_height == last_height:
                     print("No hay más contenido para cargar")
                     break
             last_height = new_height
-        
-        return posts_info[:max_posts]
+
+    def wait_for_posts(self, tile_selector, ceiling):
+        """Espera tras un scroll a que crezca la cuadrícula o se calme la red; devuelve el motivo."""
+        result = wait_for_scroll_growth(self.driver, tile_selector, min(SCROLL_WAIT_FLOOR, ceiling), ceiling, SCROLL_NETWORK_IDLE)
+        return result['reason'] if result else None
 
     def process_post(self, post_info, index, total_posts):
         try:
@@ -297,11 +792,11 @@ class InstagramScraper:
                 "Número de Post": index,
                 "URL del Post": post_link,
                 "Es Video": "Sí" if post_info.get('is_video', False) else "No",
-                "Descripción": "Obtenida con hover",
+                "Descripción": post_info.get('caption', "Obtenida con hover"),
                 "Likes": post_info.get('likes', 0),
                 "Comentarios": post_info.get('comments', 0),
-                "Fecha": "N/A",
-                "Reproducciones": "N/A"
+                "Fecha": post_info.get('date', "N/A"),
+                "Reproducciones": post_info.get('views', "N/A")
             }
             
             results_queue.put(post_data)
@@ -322,9 +817,22 @@ class InstagramScraper:
             results_queue.put(minimal_data)
             return False
 
-    def scrape_profile(self, target_profile, username=None, password=None, max_posts=MAX_POSTS, csv_filename="instagram_data"):
+    def scrape_profile(self, target_profile, username=None, password=None, max_posts=MAX_POSTS, csv_filename="instagram_data", pool=None, delta=False, stop_after=DELTA_STOP_AFTER, refresh_recent=0):
+        session = None
+        # Rastreo incremental: posts vistos en la ejecución anterior de este perfil
+        state = CrawlState("instagram", target_profile, stop_after, refresh_recent) if delta else None
         try:
-            self.setup_driver()
+            if pool:
+                # Tomar prestada una sesión ya iniciada del pool
+                start = time.perf_counter()
+                session = pool.acquire()
+                self.driver = session['driver']
+                self.logged_in = session['logged_in']
+                self.startup_time = time.perf_counter() - start
+                if self.capture_network:
+                    self.enable_network_capture()
+            else:
+                self.setup_driver()
             
             if username and password:
                 if not self.login_to_instagram(username, password):
@@ -335,14 +843,18 @@ class InstagramScraper:
             time.sleep(3)
             
             print(f"Cargando posts (máximo {max_posts})...")
-            posts_info = self.scroll_to_load_posts(max_posts)
-            
-            total_posts = len(posts_info)
-            print(f"Total de posts a procesar: {total_posts}")
-            
+            crawl_start = time.perf_counter()
+            posts_info = []
             results = []
-            for i, post in enumerate(posts_info, 1):
-                self.process_post(post, i, total_posts)
+            
+            # Cada post se procesa en cuanto aparece, sin esperar al final del scroll
+            for i, post in enumerate(self.iter_posts(max_posts, state), 1):
+                if i == 1:
+                    print(f"Primer registro a los {time.perf_counter() - crawl_start:.1f} s")
+                posts_info.append(post)
+                if self.process_post(post, i, max_posts) and state:
+                    # Solo se da por visto si se extrajo; si falla se reintenta en la siguiente ejecución
+                    state.mark_seen(shortcode_from_link(post['link']) or post['link'])
                 while not results_queue.empty():
                     results.append(results_queue.get())
                 
@@ -350,15 +862,34 @@ class InstagramScraper:
                     self.save_to_csv(results, f"{csv_filename}_parcial")
                     print(f"Guardado parcial realizado ({i} posts procesados)")
             
+            transferred = self.get_transferred_bytes()
+            if transferred is not None:
+                print(f"Bytes transferidos en el perfil: {transferred / 1024:.1f} KB")
+            
+            total_posts = len(posts_info)
+            print(f"Total de posts procesados: {total_posts} en {time.perf_counter() - crawl_start:.1f} s")
+            if self.capture_network:
+                from_network = sum(1 for post in posts_info if 'shortcode' in post)
+                print(f"Posts obtenidos de la red: {from_network}, con hover: {total_posts - from_network}")
+            
             self.save_to_csv(results, csv_filename)
+            SELECTORS.save()
+            if state:
+                state.save()
             print(f"Datos guardados en {csv_filename}.csv")
+            print(f"Tiempo de arranque del navegador: {self.startup_time:.2f} s")
             return True
             
         except Exception as e:
             print(f"Error general: {e}")
             return False
         finally:
-            if self.driver:
+            if session:
+                # Devolver la sesión al pool en lugar de cerrar el navegador
+                session['logged_in'] = self.logged_in
+                pool.release(session)
+                self.driver = None
+            elif self.driver:
                 self.driver.quit()
 
     def save_to_csv(self, posts_data, filename):
@@ -374,10 +905,146 @@ class InstagramScraper:
             writer.writeheader()
             writer.writerows(posts_data)
 
+class DriverPool:
+    """Pool de navegadores ya iniciados (y con sesión iniciada) que se reutilizan entre perfiles."""
+    
+    def __init__(self, size=1, username=None, password=None, max_idle=POOL_MAX_IDLE, lean=False, backend="selenium", capture_network=False):
+        self.size = size
+        self.username = username
+        self.password = password
+        self.max_idle = max_idle
+        self.lean = lean
+        self.backend = backend
+        self.capture_network = capture_network
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+        self._available = threading.Semaphore(size)
+    
+    def _new_session(self):
+        """Abre un navegador nuevo e inicia sesión si hay credenciales."""
+        scraper = InstagramScraper(lean=self.lean, backend=self.backend, capture_network=self.capture_network)
+        scraper.setup_driver()
+        if self.username and self.password:
+            scraper.login_to_instagram(self.username, self.password)
+        with self._lock:
+            self._created += 1
+        return {
+            'driver': scraper.driver,
+            'logged_in': scraper.logged_in,
+            'last_used': time.time()
+        }
+    
+    def _is_healthy(self, session):
+        """Comprueba que el navegador siga respondiendo."""
+        try:
+            session['driver'].execute_script("return 1")
+            return True
+        except Exception:
+            return False
+    
+    def _discard(self, session):
+        try:
+            session['driver'].quit()
+        except Exception:
+            pass
+        with self._lock:
+            self._created -= 1
+    
+    def evict_idle(self):
+        """Cierra las sesiones que llevan más de max_idle segundos sin usarse."""
+        keep = []
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if time.time() - session['last_used'] > self.max_idle:
+                print("Cerrando sesión inactiva del pool")
+                self._discard(session)
+            else:
+                keep.append(session)
+        # Reinsertar conservando el orden (la más reciente queda arriba)
+        for session in reversed(keep):
+            self._idle.put(session)
+    
+    def warm(self):
+        """Precarga el pool hasta su tamaño configurado."""
+        while self._created < self.size:
+            print(f"Precalentando navegador {self._created + 1}/{self.size}...")
+            self._idle.put(self._new_session())
+    
+    def acquire(self):
+        """Entrega una sesión sana; bloquea si todas están en uso."""
+        self._available.acquire()
+        try:
+            self.evict_idle()
+            while True:
+                try:
+                    session = self._idle.get_nowait()
+                except queue.Empty:
+                    return self._new_session()
+                if self._is_healthy(session):
+                    return session
+                print("Sesión del pool no responde, reemplazándola...")
+                self._discard(session)
+        except Exception:
+            self._available.release()
+            raise
+    
+    def release(self, session):
+        """Devuelve una sesión al pool (o la descarta si el navegador murió)."""
+        try:
+            if self._is_healthy(session):
+                session['last_used'] = time.time()
+                self._idle.put(session)
+            else:
+                self._discard(session)
+        finally:
+            self._available.release()
+    
+    def close(self):
+        """Cierra todos los navegadores del pool."""
+        while True:
+            try:
+                session = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(session)
+
+def scrape_profiles(target_profiles, username=None, password=None, max_posts=MAX_POSTS, max_idle=POOL_MAX_IDLE, lean=False, backend="selenium", capture_network=False, hover_mode="single", hover_batch=HOVER_BATCH, hover_timeout=HOVER_TIMEOUT, prune_tiles=False, delta=False, stop_after=DELTA_STOP_AFTER, refresh_recent=0):
+    """Procesa varios perfiles reutilizando el navegador del pool."""
+    # Los perfiles se procesan de uno en uno: un segundo navegador solo costaría arranque y otro login
+    pool = DriverPool(size=1, username=username, password=password, max_idle=max_idle, lean=lean, backend=backend, capture_network=capture_network)
+    try:
+        pool.warm()
+        for target_profile in target_profiles:
+            scraper = InstagramScraper(lean=lean, backend=backend, capture_network=capture_network,
+                                       hover_mode=hover_mode, hover_batch=hover_batch, hover_timeout=hover_timeout,
+                                       prune_tiles=prune_tiles)
+            scraper.scrape_profile(
+                target_profile=target_profile,
+                username=username,
+                password=password,
+                max_posts=max_posts,
+                csv_filename=f"instagram_{target_profile}",
+                pool=pool,
+                delta=delta,
+                stop_after=stop_after,
+                refresh_recent=refresh_recent
+            )
+    finally:
+        pool.close()
+
 if __name__ == "__main__":
     print("=========== INSTAGRAM SCRAPER ===========")
     
-    scraper = InstagramScraper()
+    lean = input('¿Activar modo ligero (sin imágenes, media ni fuentes)? (s/n): ').lower() == 's'
+    backend = "cdp" if input('¿Usar el motor CDP asíncrono en lugar de chromedriver? (s/n): ').lower() == 's' else "selenium"
+    capture_network = input('¿Capturar los datos de los posts desde las respuestas de red? (s/n): ').lower() == 's'
+    hover_mode = "bulk" if input('¿Hacer el hover por lotes (más rápido)? (s/n): ').lower() == 's' else "single"
+    prune = input('¿Vaciar las miniaturas ya procesadas para ahorrar memoria? (s/n): ').lower() == 's'
+    scraper = InstagramScraper(lean=lean, backend=backend, capture_network=capture_network, hover_mode=hover_mode, prune_tiles=prune)
     
     use_login = input('¿Deseas iniciar sesión automáticamente? (s/n): ').lower() == 's'
     username = None
@@ -395,10 +1062,17 @@ if __name__ == "__main__":
         max_posts = 600
         print("Se ha limitado a 600 posts")
     
+    delta = input('¿Rastreo incremental (solo posts nuevos desde la última ejecución)? (s/n): ').lower() == 's'
+    refresh_recent = 0
+    if delta:
+        refresh_recent = int(input('¿Cuántos posts conocidos recientes refrescar? (0 = ninguno): ') or 0)
+    
     scraper.scrape_profile(
         target_profile=target_profile,
         username=username,
         password=password,
         max_posts=max_posts,
-        csv_filename=filename
+        csv_filename=filename,
+        delta=delta,
+        refresh_recent=refresh_recent
     )
\ No newline at end of file
@@ -8,6 +8,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 from webdriver_manager.chrome import ChromeDriverManager
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from page_observers import read_tile_metrics
 import csv
 import time
 import queue
@@ -109,21 +110,20 @@ class InstagramScraper:
             likes = 0
             comments = 0
             
+            # Todas las métricas de esta miniatura en un solo viaje al navegador
+            metrics = read_tile_metrics(self.driver, element, "div.x1qjc9v5, div.x78zum5, div.x1q0g3np")
+            
             # ENFOQUE MEJORADO: Buscar específicamente en el overlay de métricas
             try:
-                # Intentar encontrar el contenedor de métricas que aparece en hover
-                metric_container = self.driver.find_element(
-                    By.XPATH, 
-                    "//div[contains(@class, 'x1qjc9v5') or contains(@class, 'x78zum5') or contains(@class, 'x1q0g3np')]"
-                )
-                
-                if metric_container.is_displayed():
+                # Contenedor de métricas que aparece en hover, dentro de la miniatura
+                if metrics['overlays']:
+                    metric_container = metrics['overlays'][0]
                     # Buscar todos los números en el contenedor
                     numbers = []
-                    spans = metric_container.find_elements(By.XPATH, ".//span[contains(text(), '')]")
+                    spans = metric_container['spans']
                     
                     for span in spans:
-                        text = span.text.strip()
+                        text = span.strip()
                         if text and re.search(r'\d', text):
                             num = self.extract_number(text)
                             # Aceptar 0 y cualquier cifra válida
@@ -154,15 +154,12 @@ class InstagramScraper:
             if not (likes != None and comments != None):  # Permitir el valor 0
                 # Método alternativo: buscar spans con números en todo el documento
                 try:
-                    spans = self.driver.find_elements(
-                        By.XPATH, 
-                        "//span[contains(@class, 'html-span') or contains(@class, 'x1lliihq')]"
-                    )
+                    spans = metrics['spans']
                     
                     numbers = []
                     for span in spans:
-                        if span.is_displayed():
-                            text = span.text.strip()
+                        if span:
+                            text = span.strip()
                             if text and re.search(r'\d', text):
                                 num = self.extract_number(text)
                                 # Aceptar 0 y cualquier cifra válida
@@ -192,14 +189,11 @@ class InstagramScraper:
             # Método de fallback: buscar pares de números juntos (como "335\n1567")
             if not (likes != None and comments != None):
                 try:
-                    elements = self.driver.find_elements(
-                        By.XPATH, 
-                        "//*[contains(text(), '\n') and contains(text(), '')]"
-                    )
+                    elements = metrics['lines']
                     
                     for el in elements:
-                        if el.is_displayed():
-                            text = el.text.strip()
+                        if el:
+                            text = el.strip()
                             if '\n' in text:
                                 parts = text.split('\n')
                                 nums = []
@@ -8,6 +8,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 from webdriver_manager.chrome import ChromeDriverManager
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from page_observers import read_tile_metrics
 import csv
 import time
 import queue
@@ -106,17 +107,17 @@ class InstagramScraper:
             likes = 0
             comments = 0
             
+            # Todas las métricas de esta miniatura en un solo viaje al navegador
+            metrics = read_tile_metrics(self.driver, element, "div.x1ey2m1c.x78zum5")
+            
             try:
-                # Buscar spans específicos que contienen los números
-                count_spans = self.driver.find_elements(By.XPATH, 
-                    "//div[contains(@class, 'x1lliihq')]/span | " +
-                    "//span[contains(@class, 'x1lliihq')] | " +
-                    "//div[contains(@class, 'x1lliihq')]//span")
+                # Textos de los spans de la miniatura que contienen los números
+                count_spans = metrics['spans']
                 
                 # El primer número que encontramos normalmente corresponde a likes
                 if len(count_spans) > 0:
                     for span in count_spans:
-                        text = span.text.strip()
+                        text = span.strip()
                         if text and text.isdigit():
                             likes = int(text)
                             break
@@ -127,9 +128,9 @@ class InstagramScraper:
                 comment_patterns = ["comment", "comentario"]
                 
                 # Buscamos específicamente texto que mencione comentarios
-                all_text_elements = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'x78zum5')]")
+                all_text_elements = metrics['containers']
                 for elem in all_text_elements:
-                    elem_text = elem.text.lower()
+                    elem_text = elem.lower()
                     if any(pattern in elem_text for pattern in comment_patterns):
                         # Si encontramos texto sobre comentarios, buscamos números
                         numbers = re.findall(r'\d+', elem_text.replace(',', ''))
@@ -155,11 +156,11 @@ class InstagramScraper:
                 
                 # Intentamos buscar elementos con clases específicas
                 try:
-                    metric_containers = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'x78zum5')]")
+                    metric_containers = metrics['containers']
                     if metric_containers:
                         # Por lo general el primer contenedor tiene el número de likes
                         for container in metric_containers:
-                            container_text = container.text.lower()
+                            container_text = container.lower()
                             if re.search(r'\d+', container_text):
                                 numbers = re.findall(r'\d+', container_text.replace(',', ''))
                                 if numbers:
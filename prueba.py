@@ -8,6 +8,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException, ElementClickInterceptedException
 from webdriver_manager.chrome import ChromeDriverManager
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from page_observers import read_tile_metrics
 import csv
 import time
 import queue
@@ -102,45 +103,44 @@ class InstagramScraper:
             actions.move_to_element(element).pause(1).perform()
             time.sleep(1.5)  # Esperar a que aparezcan los datos
             
+            # Todas las métricas de esta miniatura en un solo viaje al navegador
+            metrics = read_tile_metrics(self.driver, element, "div.x1ey2m1c.x78zum5")
+            
             # Intentar capturar los datos de likes y comentarios
             try:
-                # Buscamos todos los elementos overlay donde pueden aparecer métricas
-                overlays = self.driver.find_elements(By.XPATH, "//div[contains(@class, 'x1ey2m1c') and contains(@class, 'x78zum5')]")
-                
                 likes = 0
                 comments = 0
                 
-                # Extraemos información de todos los elementos encontrados
+                # Extraemos información de todos los overlays visibles de la miniatura
                 texts = []
-                for overlay in overlays:
-                    if overlay.is_displayed():
-                        overlay_text = overlay.text
-                        texts.append(overlay_text)
-                        
-                        # Buscamos patrones para likes y comentarios
-                        like_patterns = ["like", "me gusta"]
-                        comment_patterns = ["comment", "comentario"]
-                        
-                        # Procesamos el texto completo del overlay
-                        lines = overlay_text.split('\n')
-                        for line in lines:
-                            line = line.lower().strip()
-                            # Buscamos números en la línea
-                            numbers = re.findall(r'\d+', line.replace(',', ''))
-                            if numbers:
-                                num = int(numbers[0])
-                                # Decidimos si es un like o un comentario basado en el texto circundante
-                                if any(pattern in line for pattern in like_patterns):
-                                    likes = num
-                                elif any(pattern in line for pattern in comment_patterns):
-                                    comments = num
+                for overlay in metrics['overlays']:
+                    overlay_text = overlay['text']
+                    texts.append(overlay_text)
+                    
+                    # Buscamos patrones para likes y comentarios
+                    like_patterns = ["like", "me gusta"]
+                    comment_patterns = ["comment", "comentario"]
+                    
+                    # Procesamos el texto completo del overlay
+                    lines = overlay_text.split('\n')
+                    for line in lines:
+                        line = line.lower().strip()
+                        # Buscamos números en la línea
+                        numbers = re.findall(r'\d+', line.replace(',', ''))
+                        if numbers:
+                            num = int(numbers[0])
+                            # Decidimos si es un like o un comentario basado en el texto circundante
+                            if any(pattern in line for pattern in like_patterns):
+                                likes = num
+                            elif any(pattern in line for pattern in comment_patterns):
+                                comments = num
                 
                 # Si no encontramos likes o comentarios específicos, usamos un enfoque alternativo
                 if likes == 0:
-                    likes = self.get_count_from_spans("like")
+                    likes = self.get_count_from_spans(metrics, "like")
                 
                 if comments == 0:
-                    comments = self.get_count_from_spans("comment")
+                    comments = self.get_count_from_spans(metrics, "comment")
                 
                 # En caso de que solo haya un número y no se pueda determinar, asumimos que es likes
                 if likes == 0 and comments > 0:
@@ -160,8 +160,8 @@ class InstagramScraper:
                 pass
                 
             # Método alternativo si el enfoque anterior falla
-            likes = self.get_count_from_spans("like")
-            comments = self.get_count_from_spans("comment")
+            likes = self.get_count_from_spans(metrics, "like")
+            comments = self.get_count_from_spans(metrics, "comment")
             
             # Si solo se encontró un valor, asumimos que son likes
             if likes == 0 and comments > 0:
@@ -173,19 +173,16 @@ class InstagramScraper:
             print(f"Error al hacer hover: {e}")
             return 0, 0
 
-    def get_count_from_spans(self, type_str=None):
-        """Obtiene conteo de elementos desde spans genéricos"""
+    def get_count_from_spans(self, metrics, type_str=None):
+        """Obtiene conteo de elementos desde los spans de la miniatura"""
         try:
-            # Buscar el span con las clases específicas
-            count_spans = self.driver.find_elements(By.XPATH, 
-                "//div[contains(@class, 'x1lliihq')]/span | " +
-                "//span[contains(@class, 'x1lliihq')] | " +
-                "//div[contains(@class, 'x1lliihq')]//span")
+            # Textos de los spans ya leídos de la miniatura
+            count_spans = metrics['spans']
             
             # Si estamos buscando un tipo específico
             if type_str:
                 for span in count_spans:
-                    text = span.text.lower().strip()
+                    text = span.lower().strip()
                     if type_str in text:
                         numbers = re.findall(r'\d+', text.replace(',', ''))
                         if numbers:
@@ -193,7 +190,7 @@ class InstagramScraper:
             
             # Si solo queremos cualquier número
             for span in count_spans:
-                text = span.text.strip()
+                text = span.strip()
                 if text and text.isdigit():
                     return int(text)
             
@@ -0,0 +1,68 @@
+"""Registro adaptativo de selectores.
+
+Guarda cuántas veces acierta cada selector de una lista de alternativas y
+devuelve la lista reordenada para probar primero los que más aciertan. Las
+estadísticas se guardan en disco para que el orden aprendido se aplique desde
+la primera página de la siguiente ejecución. Cada extractor tiene su propio
+fichero, de modo que al guardar uno no pisa las estadísticas del otro.
+"""
+import os
+import json
+import threading
+
+SELECTOR_STATS_DIR = os.getcwd()
+
+class SelectorRegistry:
+    """Estadísticas de aciertos por lista de selectores de un sitio, persistidas en JSON."""
+
+    def __init__(self, site, directory=SELECTOR_STATS_DIR):
+        self.path = os.path.join(directory, f"selector_stats_{site}.json")
+        self._lock = threading.Lock()
+        self.stats = self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _hit_rate(self, name, selector):
+        entry = self.stats.get(name, {}).get(selector)
+        if not entry:
+            return 0.5
+        # Suavizado de Laplace: un selector nuevo empieza en 0.5
+        return (entry['hits'] + 1) / (entry['tries'] + 2)
+
+    def ordered(self, name, selectors):
+        """Devuelve los selectores de mayor a menor tasa de acierto (empates en el orden original)."""
+        with self._lock:
+            ranked = sorted(enumerate(selectors), key=lambda item: (-self._hit_rate(name, item[1]), item[0]))
+        return [selector for _, selector in ranked]
+
+    def record(self, name, selector, hit):
+        with self._lock:
+            entry = self.stats.setdefault(name, {}).setdefault(selector, {'hits': 0, 'tries': 0})
+            entry['tries'] += 1
+            if hit:
+                entry['hits'] += 1
+
+    def record_chain(self, name, selectors, matched):
+        """Registra una cadena probada en orden: fallos hasta `matched` y acierto en él."""
+        for selector in selectors:
+            if selector == matched:
+                self.record(name, selector, True)
+                return
+            self.record(name, selector, False)
+
+    def save(self):
+        """Escribe las estadísticas en disco."""
+        with self._lock:
+            data = json.dumps(self.stats, indent=2)
+        try:
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"No se pudieron guardar las estadísticas de selectores: {e}")